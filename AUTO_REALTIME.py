@@ -1,14 +1,22 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import time
-from datetime import datetime, time as dt_time, timedelta
+from datetime import datetime
 import pytz
 import threading
 from streamlit_autorefresh import st_autorefresh
 import numpy as np
+import indicators
+import portfolio
+import export
+import http_pool
+import scheduler
+import stock_core
+import streamlit_logging
+from stock_core import (calculate_rsi, detect_candlestick_patterns, get_stock_data, get_volume_trend_data,
+                        generate_recommendations, generate_alerts)
 
 # Initialize session state
 if 'watchlist' not in st.session_state:
@@ -17,214 +25,19 @@ if 'auto_refresh' not in st.session_state:
     st.session_state.auto_refresh = False
 if 'refresh_interval' not in st.session_state:
     st.session_state.refresh_interval = 60  # Default to 60 seconds
+if 'price_freshness' not in st.session_state:
+    st.session_state.price_freshness = 0.25  # Fraction of a candle; 0 refreshes only when a new candle is due
 if 'last_refresh_time' not in st.session_state:
     st.session_state.last_refresh_time = time.time()
 if 'refresh_count' not in st.session_state:
     st.session_state.refresh_count = 0
+if 'price_matrix' not in st.session_state:
+    st.session_state.price_matrix = None
+if 'refresh_schedule' not in st.session_state:
+    st.session_state.refresh_schedule = {}
 
-# Custom RSI calculation
-def calculate_rsi(data, periods=14):
-    delta = data['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=periods, min_periods=1).mean()
-    avg_loss = loss.rolling(window=periods, min_periods=1).mean()
-    rs = avg_gain / avg_loss.where(avg_loss != 0, 1e-10)
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-# Detect breakout patterns
-def detect_breakout(df, lookback=20):
-    if len(df) < lookback:
-        return None, None
-    recent_data = df[-lookback:]
-    resistance = recent_data['High'].max()
-    support = recent_data['Low'].min()
-    avg_volume = recent_data['Volume'].mean()
-    current_price = df['Close'].iloc[-1]
-    current_volume = df['Volume'].iloc[-1]
-    
-    if current_price > resistance and current_volume > 1.5 * avg_volume:
-        return 'Bullish', f"Price broke above resistance (${resistance:.2f}) with high volume"
-    elif current_price < support and current_volume > 1.5 * avg_volume:
-        return 'Bearish', f"Price broke below support (${support:.2f}) with high volume"
-    return None, None
-
-# Detect candlestick patterns
-def detect_candlestick_patterns(df):
-    patterns = []
-    if len(df) < 3:
-        return patterns
-    
-    for i in range(2, len(df)):
-        curr = df.iloc[i]
-        prev = df.iloc[i-1]
-        prev2 = df.iloc[i-2]
-        open_c, close_c, high_c, low_c = curr['Open'], curr['Close'], curr['High'], curr['Low']
-        open_p, close_p, high_p, low_p = prev['Open'], prev['Close'], prev['High'], prev['Low']
-        open_p2, close_p2, high_p2, low_p2 = prev2['Open'], prev2['Close'], prev2['High'], prev2['Low']
-        
-        # Calculate confidence
-        avg_volume = df['Volume'].iloc[max(0, i-20):i].mean()
-        volume_score = 50 if df['Volume'].iloc[i] > 1.5 * avg_volume else 0
-        rsi = calculate_rsi(df.iloc[:i+1]).iloc[-1] if len(df.iloc[:i+1]) >= 14 else 50
-        
-        # Bullish Engulfing
-        if close_p < open_p and close_c > open_c and close_c > open_p and open_c < close_p:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bullish Engulfing',
-                'Signal': 'Bullish',
-                'Details': 'Price may rise after engulfing prior bearish candle',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Bearish Engulfing
-        elif close_p > open_p and close_c < open_c and close_c < open_p and open_c > close_p:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bearish Engulfing',
-                'Signal': 'Bearish',
-                'Details': 'Price may fall after engulfing prior bullish candle',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Doji
-        elif abs(close_c - open_c) <= (high_c - low_c) * 0.1:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Doji',
-                'Signal': 'Neutral',
-                'Details': 'Market indecision; watch for breakout',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Hammer
-        elif (high_c - low_c) > 2 * abs(close_c - open_c) and (close_c - low_c) >= 0.7 * (high_c - low_c) and (open_c - low_c) >= 0.7 * (high_c - low_c):
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Hammer',
-                'Signal': 'Bullish',
-                'Details': 'Potential reversal upward after downtrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Shooting Star
-        elif (high_c - low_c) > 2 * abs(close_c - open_c) and (high_c - close_c) >= 0.7 * (high_c - low_c) and (high_c - open_c) >= 0.7 * (high_c - low_c):
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Shooting Star',
-                'Signal': 'Bearish',
-                'Details': 'Potential reversal downward after uptrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Morning Star
-        elif close_p2 > open_p2 and close_p < open_p and abs(close_p - open_p) < (high_p - low_p) * 0.3 and close_c > open_c and close_c > (open_p2 + close_p2) / 2:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Morning Star',
-                'Signal': 'Bullish',
-                'Details': 'Strong reversal upward after downtrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Evening Star
-        elif close_p2 < open_p2 and close_p > open_p and abs(close_p - open_p) < (high_p - low_p) * 0.3 and close_c < open_c and close_c < (open_p2 + close_p2) / 2:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Evening Star',
-                'Signal': 'Bearish',
-                'Details': 'Strong reversal downward after uptrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Bullish Harami
-        elif close_p < open_p and close_c > open_c and open_c >= close_p and close_c <= open_p:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bullish Harami',
-                'Signal': 'Bullish',
-                'Details': 'Potential reversal upward; small bullish candle inside bearish candle',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Bearish Harami
-        elif close_p > open_p and close_c < open_c and open_c <= close_p and close_c >= open_p:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bearish Harami',
-                'Signal': 'Bearish',
-                'Details': 'Potential reversal downward; small bearish candle inside bullish candle',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Bullish Kicker
-        elif close_p < open_p and close_c > open_c and open_c > high_p:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bullish Kicker',
-                'Signal': 'Bullish',
-                'Details': 'Strong bullish reversal with gap up after downtrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Bearish Kicker
-        elif close_p > open_p and close_c < open_c and open_c < low_p:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Bearish Kicker',
-                'Signal': 'Bearish',
-                'Details': 'Strong bearish reversal with gap down after uptrend',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Three White Soldiers
-        if i >= 3 and close_c > open_c and close_p > open_p and close_p2 > open_p2 and \
-           (close_c - open_c) > (high_c - low_c) * 0.5 and (close_p - open_p) > (high_p - low_p) * 0.5 and \
-           (close_p2 - open_p2) > (high_p2 - low_p2) * 0.5:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Three White Soldiers',
-                'Signal': 'Bullish',
-                'Details': 'Strong upward momentum with three consecutive bullish candles',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Three Black Crows
-        elif i >= 3 and close_c < open_c and close_p < open_p and close_p2 < open_p2 and \
-             (open_c - close_c) > (high_c - low_c) * 0.5 and (open_p - close_p) > (high_p - low_p) * 0.5 and \
-             (open_p2 - close_p2) > (high_p2 - low_p2) * 0.5:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Three Black Crows',
-                'Signal': 'Bearish',
-                'Details': 'Strong downward momentum with three consecutive bearish candles',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Piercing Line
-        elif close_p < open_p and close_c > open_c and close_c > (open_p + close_p) / 2 and open_c < close_p:
-            rsi_score = 50 * (rsi / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Piercing Line',
-                'Signal': 'Bullish',
-                'Details': 'Bullish reversal; bullish candle pierces bearish candle midpoint',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-        # Dark Cloud Cover
-        elif close_p > open_p and close_c < open_c and close_c < (open_p + close_p) / 2 and open_c > close_p:
-            rsi_score = 50 * ((100 - rsi) / 100)
-            patterns.append({
-                'Timestamp': curr.name.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                'Pattern': 'Dark Cloud Cover',
-                'Signal': 'Bearish',
-                'Details': 'Bearish reversal; bearish candle covers bullish candle midpoint',
-                'Confidence': round(volume_score + rsi_score, 1)
-            })
-    
-    return patterns
+# Show messages from the shared fetch/analysis code in the page
+streamlit_logging.install(stock_core.logger)
 
 # Style candlestick patterns table
 def style_patterns_df(df):
@@ -237,120 +50,6 @@ def style_patterns_df(df):
             return ['background-color: #FFFFFF'] * len(row)
     return df.style.apply(color_rows, axis=1).format({'Confidence': '{:.1f}'})
 
-# Custom functions
-def get_stock_data(symbol, interval, extended_hours=False):
-    try:
-        supported_intervals = {'1m': '1m', '2m': '2m', '3m': '1m', '5m': '5m', '10m': '1m', 
-                              '15m': '15m', '30m': '30m', '45m': '1m', '1h': '1h', 
-                              '2h': '1h', '3h': '1h', '4h': '1h'}
-        period = '7d' if interval in ['2h', '3h', '4h'] else '1d'
-        fetch_interval = supported_intervals[interval]
-        
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period, interval=fetch_interval)
-        if df.empty or len(df) < 2:
-            st.error(f"No sufficient data for {symbol} with interval {interval}")
-            return None
-        
-        # Resample for non-standard intervals
-        if interval == '3m':
-            df = df.resample('3min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
-                                        'Close': 'last', 'Volume': 'sum'}).dropna()
-        elif interval == '10m':
-            df = df.resample('10min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
-                                         'Close': 'last', 'Volume': 'sum'}).dropna()
-        elif interval == '45m':
-            df = df.resample('45min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
-                                         'Close': 'last', 'Volume': 'sum'}).dropna()
-        elif interval in ['2h', '3h', '4h']:
-            hours = int(interval[0])
-            df = df.resample(f'{hours}H').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
-                                             'Close': 'last', 'Volume': 'sum'}).dropna()
-        
-        # Filter for current trading day or extended hours
-        local_tz = pytz.timezone('America/New_York')
-        df = df.tz_convert(local_tz)
-        today = datetime.now(local_tz).date()
-        if extended_hours:
-            df = df.between_time(dt_time(4, 0), dt_time(20, 0))  # Pre/post-market
-        else:
-            df = df[df.index.date == today]
-        
-        if df.empty or len(df) < 2:
-            # Fallback to previous trading day
-            yesterday = today - timedelta(days=1)
-            df = stock.history(period='2d', interval=fetch_interval)
-            df = df.tz_convert(local_tz)
-            df = df[df.index.date == yesterday]
-            if extended_hours:
-                df = df.between_time(dt_time(4, 0), dt_time(20, 0))
-            else:
-                df = df.between_time(dt_time(9, 30), dt_time(16, 0))
-            
-            if df.empty or len(df) < 2:
-                st.warning(f"No data for {symbol} on current or previous trading day with interval {interval}")
-                return None
-        
-        current_price = df['Close'].iloc[-1]
-        previous_price = df['Close'].iloc[-2]
-        current_volume = df['Volume'].iloc[-1]
-        previous_volume = df['Volume'].iloc[-2]
-        timestamp = df.index[-1]
-        timestamp_local = timestamp.strftime('%Y-%m-%d %H:%M:%S %Z')
-        change_pct = round(((current_price - previous_price) / previous_price) * 100, 3)
-        volume_change_pct = round(((current_volume - previous_volume) / previous_volume) * 100, 3) if previous_volume > 0 else 0
-        return {
-            'data': df,
-            'price': current_price,
-            'volume': current_volume,
-            'open': df['Open'].iloc[-1],
-            'high': df['High'].iloc[-1],
-            'low': df['Low'].iloc[-1],
-            'change_pct': change_pct,
-            'volume_change_pct': volume_change_pct,
-            'timestamp': timestamp_local
-        }
-    except Exception as e:
-        st.error(f"Error fetching data for {symbol}: {str(e)}")
-        return None
-
-def get_volume_trend_data(symbol, extended_hours=False):
-    try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period='2d', interval='1m')
-        if df.empty or len(df) < 2:
-            st.error(f"No intraday data for {symbol}")
-            return None
-        local_tz = pytz.timezone('America/New_York')
-        df = df.tz_convert(local_tz)
-        today = datetime.now(local_tz).date()
-        
-        # Try current day first
-        df_today = df[df.index.date == today]
-        if extended_hours:
-            df_today = df_today.between_time(dt_time(4, 0), dt_time(20, 0))
-        else:
-            df_today = df_today.between_time(dt_time(9, 30), dt_time(16, 0))
-        
-        if not df_today.empty and len(df_today) >= 2:
-            return df_today
-        
-        # Fallback to previous trading day
-        yesterday = today - timedelta(days=1)
-        df_yesterday = df[df.index.date == yesterday]
-        if extended_hours:
-            df_yesterday = df_yesterday.between_time(dt_time(4, 0), dt_time(20, 0))
-        else:
-            df_yesterday = df_yesterday.between_time(dt_time(9, 30), dt_time(16, 0))
-        
-        if df_yesterday.empty or len(df_yesterday) < 2:
-            st.warning(f"No data for {symbol} on current or previous trading day")
-            return None
-        return df_yesterday
-    except Exception as e:
-        st.error(f"Error fetching intraday data for {symbol}: {str(e)}")
-        return None
-
 def create_candlestick_chart(df, symbol, interval):
     if df is not None and not df.empty:
         fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.1, 
@@ -367,7 +66,7 @@ def create_candlestick_chart(df, symbol, interval):
         
         # SMA
         if len(df) >= 50:
-            sma = df['Close'].rolling(window=50).mean()
+            sma = indicators.sma(df['Close'].to_numpy(), 50)
             fig.add_trace(go.Scatter(x=df.index, y=sma, name='50-Period SMA', line=dict(color='orange', width=2)), row=1, col=1)
         else:
             st.warning(f"Insufficient data for 50-period SMA ({len(df)} candles < 50)")
@@ -469,68 +168,41 @@ def create_portfolio_chart(symbols, changes):
         st.warning("Invalid or missing data for portfolio chart")
         return None
 
-def generate_recommendations(symbol, df_volume, change_pct, df_candlestick):
-    recommendations = []
-    
-    # Breakout detection
-    breakout_signal, breakout_details = detect_breakout(df_candlestick)
-    if breakout_signal:
-        recommendations.append(f"{breakout_signal} breakout detected: {breakout_details}")
-    
-    # Volume spikes
-    if df_volume is not None and not df_volume.empty:
-        volume_data = df_volume['Volume']
-        volume_changes = volume_data.pct_change() * 100
-        spike_threshold = 50
-        spikes = volume_changes[volume_changes > spike_threshold]
-        if not spikes.empty:
-            spike_times = spikes.index.strftime('%H:%M')
-            recommendations.append(f"High volume spikes detected at {', '.join(spike_times)} EDT, indicating strong buying/selling pressure.")
-    
-    # Price momentum
-    if isinstance(change_pct, (int, float, np.floating)) and not np.isnan(change_pct):
-        if change_pct > 2:
-            recommendations.append(f"{symbol} (+{change_pct:.3f}%) shows bullish momentum; consider holding or buying on dips.")
-        elif change_pct < -2:
-            recommendations.append(f"{symbol} ({change_pct:+.3f}%) shows bearish momentum; consider selling or waiting for a reversal.")
-        else:
-            recommendations.append(f"{symbol} ({change_pct:+.3f}%) is stable; monitor for breakout patterns or candlestick signals.")
-    
-    # Candlestick patterns
-    patterns = detect_candlestick_patterns(df_candlestick)
-    for pattern in patterns[-3:]:  # Show last 3 patterns
-        recommendations.append(f"{pattern['Signal']} pattern detected at {pattern['Timestamp']}: {pattern['Pattern']} ({pattern['Details']}, Confidence: {pattern['Confidence']:.1f})")
-    
-    # SMA
-    if df_candlestick is not None and len(df_candlestick) >= 50:
-        sma = df_candlestick['Close'].rolling(window=50).mean().iloc[-1]
-        current_price = df_candlestick['Close'].iloc[-1]
-        if current_price > sma:
-            recommendations.append("Price is above 50-period SMA; bullish trend indicated.")
-        elif current_price < sma:
-            recommendations.append("Price is below 50-period SMA; bearish trend indicated.")
-    
-    # RSI
-    if df_candlestick is not None and len(df_candlestick) >= 14:
-        rsi = calculate_rsi(df_candlestick).iloc[-1]
-        if rsi > 70:
-            recommendations.append("RSI above 70; stock may be overbought, consider taking profits.")
-        elif rsi < 30:
-            recommendations.append("RSI below 30; stock may be oversold, potential buying opportunity.")
-    
-    recommendations.append("Note: These are not financial advice; consult a professional.")
-    return recommendations if recommendations else ["No specific recommendations; monitor market conditions. Note: These are not financial advice; consult a professional."]
+def create_performance_chart(analytics):
+    fig = go.Figure()
+    for row, symbol in enumerate(analytics['symbols']):
+        fig.add_trace(go.Scatter(x=analytics['timestamps'], y=analytics['performance'][row], mode='lines', name=symbol))
+    fig.update_layout(
+        title="Normalized Performance",
+        xaxis_title="Time",
+        yaxis_title="Change Since Start (%)",
+        template="plotly_white",
+        yaxis=dict(zeroline=True, zerolinecolor='black', zerolinewidth=1)
+    )
+    return fig
 
-def generate_alerts(symbol, change_pct, volume_change_pct, df_candlestick):
-    alerts = []
-    if isinstance(change_pct, (int, float, np.floating)) and not np.isnan(change_pct) and abs(change_pct) > 5:
-        alerts.append(f"Significant price movement in {symbol}: {change_pct:+.3f}%")
-    if isinstance(volume_change_pct, (int, float, np.floating)) and not np.isnan(volume_change_pct) and volume_change_pct > 100:
-        alerts.append(f"Significant volume spike in {symbol}: +{volume_change_pct:.3f}%")
-    breakout_signal, breakout_details = detect_breakout(df_candlestick)
-    if breakout_signal:
-        alerts.append(f"{breakout_signal} breakout detected for {symbol}: {breakout_details}")
-    return alerts
+def create_rolling_chart(analytics, key, title, yaxis_title, skip_benchmark=False):
+    fig = go.Figure()
+    for row, symbol in enumerate(analytics['symbols']):
+        if skip_benchmark and symbol == analytics['benchmark']:
+            continue
+        fig.add_trace(go.Scatter(x=analytics['timestamps'], y=analytics[key][row], mode='lines', name=symbol))
+    fig.update_layout(title=title, xaxis_title="Time", yaxis_title=yaxis_title, template="plotly_white")
+    return fig
+
+def create_correlation_heatmap(analytics):
+    fig = go.Figure(go.Heatmap(
+        z=analytics['correlation_matrix'],
+        x=analytics['symbols'],
+        y=analytics['symbols'],
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        text=np.round(analytics['correlation_matrix'], 2),
+        texttemplate="%{text}" if len(analytics['symbols']) <= 20 else None
+    ))
+    fig.update_layout(title="Return Correlation (Latest Window)", template="plotly_white")
+    return fig
 
 # Configure page
 st.set_page_config(
@@ -555,15 +227,28 @@ threading.Thread(target=display_clock, daemon=True).start()
 st.title("📈 Real-Time Stock Monitoring Dashboard")
 st.markdown("Track multiple stocks with interactive candlestick charts, breakout patterns, and candlestick signals")
 
-# Auto-refresh logic
+# Schedule the next refresh of a symbol from its newest bar
+def schedule_refresh(symbol, df, interval, extended_hours):
+    scheduler.record_fetch(st.session_state.refresh_schedule, symbol, df.index[-1].timestamp(), interval,
+                           extended_hours=extended_hours, max_gap=scheduler.freshness_gap(interval, st.session_state.price_freshness))
+
+# Auto-refresh logic: wake up when the earliest symbol's next candle is due and fetch only the due symbols
 if st.session_state.auto_refresh:
-    refresh_count = st_autorefresh(interval=st.session_state.refresh_interval * 1000, key="stockrefresh")
-    if refresh_count > 0:
+    watchlist_symbols = list(st.session_state.watchlist.keys())
+    refresh_wait = scheduler.seconds_until_due(st.session_state.refresh_schedule, watchlist_symbols)
+    refresh_count = st_autorefresh(interval=int(refresh_wait * 1000), key="stockrefresh")
+    due_symbols = scheduler.due_symbols(st.session_state.refresh_schedule, watchlist_symbols)
+    # The sidebar toggle is drawn below, so read its value from the previous run
+    auto_extended_hours = st.session_state.get('extended_hours', False)
+    if refresh_count > 0 and due_symbols:
         with st.spinner("🔄 Auto-refreshing stock data..."):
             any_data_updated = False
-            for symbol in list(st.session_state.watchlist.keys()):
-                data = get_stock_data(symbol, st.session_state.watchlist[symbol]['interval'], extended_hours=True)
-                if data is not None:
+            for symbol in due_symbols:
+                data = get_stock_data(symbol, st.session_state.watchlist[symbol]['interval'], auto_extended_hours)
+                if data is None:
+                    scheduler.defer(st.session_state.refresh_schedule, symbol, st.session_state.refresh_interval)
+                else:
+                    schedule_refresh(symbol, data['data'], st.session_state.watchlist[symbol]['interval'], auto_extended_hours)
                     st.session_state.watchlist[symbol]['data'] = data['data']
                     st.session_state.watchlist[symbol]['last_update'] = data['timestamp']
                     st.session_state.watchlist[symbol]['price'] = data['price']
@@ -608,18 +293,29 @@ with st.sidebar:
         #"Include Extended Hours (Pre/Post-Market)",
         "EH Hours(Pre/Post)",
         value=False,
+        key="extended_hours",
         help="Include pre-market (4:00 AM–9:30 AM EDT) and post-market (4:00 PM–8:00 PM EDT) data"
     )
     
     refresh_interval = st.number_input(
-        "Auto-Refresh Interval (seconds)",
+        "Retry Interval (seconds)",
         min_value=10,
         max_value=3600,
         value=st.session_state.refresh_interval,
         step=10,
-        help="Set the interval for auto-refresh in seconds"
+        help="How long to wait before retrying a stock whose fetch failed"
     )
     st.session_state.refresh_interval = refresh_interval
+
+    freshness_options = {0: "Off (new candles only)", 0.5: "Every Half Candle", 0.25: "Every Quarter Candle"}
+    price_freshness = st.selectbox(
+        "Price Freshness Cap",
+        options=list(freshness_options.keys()),
+        format_func=lambda x: freshness_options[x],
+        index=list(freshness_options.keys()).index(st.session_state.price_freshness),
+        help="While the market is open, also refresh the forming candle this often (at most once a minute). Off fetches each stock once per candle"
+    )
+    st.session_state.price_freshness = price_freshness
     
     auto_refresh = st.toggle(
         "Enable Auto-Refresh",
@@ -634,6 +330,7 @@ with st.sidebar:
             if symbol:
                 data = get_stock_data(symbol, selected_interval, extended_hours)
                 if data is not None:
+                    schedule_refresh(symbol, data['data'], selected_interval, extended_hours)
                     st.session_state.watchlist[symbol] = {
                         'data': data['data'],
                         'interval': selected_interval,
@@ -660,6 +357,7 @@ with st.sidebar:
             for symbol in list(st.session_state.watchlist.keys()):
                 data = get_stock_data(symbol, st.session_state.watchlist[symbol]['interval'], extended_hours)
                 if data is not None:
+                    schedule_refresh(symbol, data['data'], st.session_state.watchlist[symbol]['interval'], extended_hours)
                     st.session_state.watchlist[symbol]['data'] = data['data']
                     st.session_state.watchlist[symbol]['last_update'] = data['timestamp']
                     st.session_state.watchlist[symbol]['price'] = data['price']
@@ -676,6 +374,8 @@ with st.sidebar:
 
     if st.button("🗑️ Clear All Stocks", type="secondary"):
         st.session_state.watchlist = {}
+        st.session_state.price_matrix = None
+        st.session_state.refresh_schedule = {}
         st.success("✅ All stocks cleared!")
         st.rerun()
     
@@ -683,6 +383,15 @@ with st.sidebar:
     st.markdown(f"**Auto-Refresh Enabled:** {'Yes' if st.session_state.auto_refresh else 'No'}")
     st.markdown(f"**Last Refresh:** {datetime.fromtimestamp(st.session_state.last_refresh_time).astimezone(pytz.timezone('America/New_York')).strftime('%Y-%m-%d %H:%M:%S %Z') if st.session_state.last_refresh_time else 'N/A'}")
     st.markdown(f"**Refresh Count:** {st.session_state.refresh_count}")
+    st.markdown(f"**Market Session:** {scheduler.market_session().title()}")
+    if st.session_state.auto_refresh and st.session_state.refresh_schedule:
+        next_symbol = min(st.session_state.refresh_schedule, key=lambda s: st.session_state.refresh_schedule[s]['due'])
+        next_due = datetime.fromtimestamp(st.session_state.refresh_schedule[next_symbol]['due']).astimezone(pytz.timezone('America/New_York'))
+        st.markdown(f"**Next Refresh:** {next_symbol} at {next_due.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+    pool_stats = http_pool.pool_stats()
+    if pool_stats:
+        with st.expander("🔌 Connection Pools"):
+            st.dataframe(pd.DataFrame(pool_stats), hide_index=True, use_container_width=True)
 
     st.subheader("📈 Volume Trend")
     selected_volume_stock = st.selectbox(
@@ -718,6 +427,25 @@ with tab1:
             mime="text/csv"
         )
         
+        # Snapshot export of every symbol's bars/indicators or patterns, generated when clicked
+        export_frames = {symbol: info['data'] for symbol, info in st.session_state.watchlist.items()}
+        export_format = st.selectbox("Snapshot Export Format", options=list(export.EXPORT_FORMATS), key="export_format")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Export Bar History & Indicators",
+                data=lambda: export.export_file(export_frames, 'bars', export_format),
+                file_name=export.export_file_name("watchlist", 'bars', export_format),
+                mime=export.export_mime(export_format)
+            )
+        with col2:
+            st.download_button(
+                label="📥 Export Candlestick Patterns",
+                data=lambda: export.export_file(export_frames, 'patterns', export_format),
+                file_name=export.export_file_name("watchlist", 'patterns', export_format),
+                mime=export.export_mime(export_format)
+            )
+        
         for symbol, stock_info in st.session_state.watchlist.items():
             with st.container():
                 st.subheader(f"📊 {symbol}")
@@ -785,7 +513,7 @@ with tab1:
 
 with tab2:
     st.header("Portfolio Performance Overview")
-    st.markdown("Percentage change for all stocks in your watchlist")
+    st.markdown("Percentage change, normalized performance, volatility and correlation for all stocks in your watchlist")
     if st.session_state.watchlist:
         symbols = list(st.session_state.watchlist.keys())
         changes = []
@@ -810,6 +538,27 @@ with tab2:
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("Failed to render portfolio performance chart")
+
+        st.subheader("Multi-Symbol Comparison")
+        st.session_state.price_matrix = portfolio.update_price_matrix(
+            st.session_state.price_matrix,
+            {symbol: info['data'] for symbol, info in st.session_state.watchlist.items()},
+            {symbol: info['interval'] for symbol, info in st.session_state.watchlist.items()}
+        )
+        if st.session_state.price_matrix is None or st.session_state.price_matrix['close'].shape[1] < 3:
+            st.info("Not enough aligned price data for comparison charts")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                benchmark = st.selectbox("Correlation Benchmark", options=st.session_state.price_matrix['symbols'], key="benchmark")
+            with col2:
+                corr_window = st.number_input("Rolling Window (bars)", min_value=5, max_value=200, value=30, step=5)
+            analytics = portfolio.portfolio_analytics(st.session_state.price_matrix, window=corr_window, benchmark=benchmark)
+            st.plotly_chart(create_performance_chart(analytics), use_container_width=True)
+            st.plotly_chart(create_rolling_chart(analytics, 'volatility', f"Rolling Volatility ({corr_window} bars)", "Std. Dev. of Returns (%)"), use_container_width=True)
+            if len(analytics['symbols']) > 1:
+                st.plotly_chart(create_rolling_chart(analytics, 'correlation', f"Rolling Correlation with {benchmark} ({corr_window} bars)", "Correlation", skip_benchmark=True), use_container_width=True)
+                st.plotly_chart(create_correlation_heatmap(analytics), use_container_width=True)
     else:
         st.info("No stocks in watchlist to display portfolio performance.")
 
@@ -0,0 +1,201 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from stock_core import PATTERN_CHAIN_1, PATTERN_CHAIN_2, pattern_codes, pattern_confidence
+
+# Signals replayed by the backtest: the candlestick patterns from stock_core, then the
+# remaining signals used by generate_recommendations
+INDICATOR_SIGNALS = [
+    ('Bullish Breakout', 'Bullish'),
+    ('Bearish Breakout', 'Bearish'),
+    ('Bullish Momentum', 'Bullish'),
+    ('Bearish Momentum', 'Bearish'),
+    ('Above 50-Period SMA', 'Bullish'),
+    ('Below 50-Period SMA', 'Bearish'),
+    ('RSI Overbought', 'Bearish'),
+    ('RSI Oversold', 'Bullish'),
+]
+ALL_SIGNALS = PATTERN_CHAIN_1 + PATTERN_CHAIN_2 + INDICATOR_SIGNALS
+SIGNAL_DIRECTION = {'Bullish': 1, 'Bearish': -1, 'Neutral': 0}
+
+CONFIDENCE_EDGES = [25, 50, 75]
+CONFIDENCE_LABELS = ['0-25', '25-50', '50-75', '75-100', 'n/a']
+DEFAULT_HORIZONS = (1, 5, 15, 60)
+DATA_EXTENSIONS = ('.parquet', '.csv', '.csv.gz')
+
+# Boolean masks for the breakout, momentum, SMA and RSI recommendations
+def indicator_masks(h, l, c, v, rsi, lookback=20):
+    resistance = indicators.rolling_max(h, lookback)
+    support = indicators.rolling_min(l, lookback)
+    avg_volume = indicators.sma(v, lookback)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change_pct = np.round((c - np.roll(c, 1)) / np.roll(c, 1) * 100, 3)
+    change_pct[:1] = np.nan
+    sma = indicators.sma(c, 50)
+    has_rsi = np.arange(len(c)) >= 13
+    return [
+        (c > resistance) & (v > 1.5 * avg_volume),
+        (c < support) & (v > 1.5 * avg_volume),
+        change_pct > 2,
+        change_pct < -2,
+        c > sma,
+        c < sma,
+        has_rsi & (rsi > 70),
+        has_rsi & (rsi < 30),
+    ]
+
+# Forward close-to-close returns per horizon, optionally kept within one session
+def forward_returns(c, horizons, days=None):
+    n = len(c)
+    out = {}
+    for hz in horizons:
+        fwd = np.full(n, np.nan)
+        if hz < n:
+            fwd[:n - hz] = c[hz:] / c[:n - hz] - 1
+            if days is not None:
+                fwd[:n - hz][days[hz:] != days[:n - hz]] = np.nan
+        out[hz] = fwd
+    return out
+
+# Replay one symbol's bars and return summed hit/return statistics per signal and confidence bucket
+def evaluate_frame(df, horizons=DEFAULT_HORIZONS, same_session=True):
+    df = df.sort_index()
+    o, h, l, c, v = (df[col].to_numpy(dtype=np.float64) for col in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    if len(c) < 3:
+        return pd.DataFrame()
+
+    days = None
+    if same_session and isinstance(df.index, pd.DatetimeIndex):
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        days = index.normalize().asi8
+    fwd = forward_returns(c, horizons, days)
+    rsi = indicators.rsi(c)
+
+    events = []
+    directions = np.array([SIGNAL_DIRECTION[signal] for _, signal in ALL_SIGNALS])
+    for code in pattern_codes(o, h, l, c):
+        bars = np.flatnonzero(code >= 0)
+        events.append((code[bars], bars))
+    offset = len(PATTERN_CHAIN_1) + len(PATTERN_CHAIN_2)
+    for k, mask in enumerate(indicator_masks(h, l, c, v, rsi)):
+        bars = np.flatnonzero(mask)
+        events.append((np.full(len(bars), offset + k), bars))
+    signal_ids = np.concatenate([e[0] for e in events]).astype(np.int64)
+    bars = np.concatenate([e[1] for e in events])
+    if len(bars) == 0:
+        return pd.DataFrame()
+
+    direction = directions[signal_ids]
+    is_pattern = signal_ids < offset
+    bullish_conf, bearish_conf = pattern_confidence(v, rsi)
+    confidence = np.where(direction < 0, bearish_conf[bars], bullish_conf[bars])
+    bucket = np.where(is_pattern, np.digitize(confidence, CONFIDENCE_EDGES), len(CONFIDENCE_LABELS) - 1)
+
+    n_keys = len(ALL_SIGNALS) * len(CONFIDENCE_LABELS)
+    key = signal_ids * len(CONFIDENCE_LABELS) + bucket
+    stats = {'count': np.bincount(key, minlength=n_keys)}
+    for hz in horizons:
+        ret = fwd[hz][bars]
+        valid = ~np.isnan(ret)
+        signed = np.where(valid, ret * direction, 0.0)
+        stats[f'n_{hz}'] = np.bincount(key, weights=valid.astype(np.float64), minlength=n_keys)
+        stats[f'hits_{hz}'] = np.bincount(key, weights=(valid & (signed > 0)).astype(np.float64), minlength=n_keys)
+        stats[f'ret_{hz}'] = np.bincount(key, weights=np.where(valid, ret, 0.0), minlength=n_keys)
+
+    present = np.flatnonzero(stats['count'])
+    result = pd.DataFrame({name: values[present] for name, values in stats.items()})
+    result.insert(0, 'Signal', [ALL_SIGNALS[k // len(CONFIDENCE_LABELS)][0] for k in present])
+    result.insert(1, 'Direction', [ALL_SIGNALS[k // len(CONFIDENCE_LABELS)][1] for k in present])
+    result.insert(2, 'Confidence', [CONFIDENCE_LABELS[k % len(CONFIDENCE_LABELS)] for k in present])
+    return result
+
+# Load stored OHLCV bars for one symbol (Parquet or CSV with a timestamp index)
+def load_bars(path):
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index, utc=True).tz_convert('America/New_York')
+    return df[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+# Map symbol -> file for every bar file in a directory (e.g. data/AAPL.parquet)
+def discover_symbols(data_dir):
+    files = {}
+    for name in sorted(os.listdir(data_dir)):
+        for ext in DATA_EXTENSIONS:
+            if name.endswith(ext):
+                files[name[:-len(ext)].upper()] = os.path.join(data_dir, name)
+                break
+    return files
+
+def _evaluate_file(task):
+    symbol, path, horizons, same_session = task
+    result = evaluate_frame(load_bars(path), horizons, same_session)
+    if not result.empty:
+        result.insert(0, 'Symbol', symbol)
+    return result
+
+# Turn summed statistics into hit rates and average forward returns (%)
+def summarize(stats, horizons, by):
+    grouped = stats.groupby(by, sort=False).sum(numeric_only=True)
+    report = pd.DataFrame({'Count': grouped['count'].astype(int)}, index=grouped.index)
+    for hz in horizons:
+        n = grouped[f'n_{hz}'].replace(0, np.nan)
+        report[f'Hit Rate {hz} (%)'] = (grouped[f'hits_{hz}'] / n * 100).round(2)
+        report[f'Avg Return {hz} (%)'] = (grouped[f'ret_{hz}'] / n * 100).round(4)
+    neutral = report.index.get_level_values('Direction') == 'Neutral'
+    report.loc[neutral, [col for col in report.columns if col.startswith('Hit Rate')]] = np.nan
+    return report
+
+# Backtest every symbol in data_dir across a process pool
+def run_backtest(data_dir, symbols=None, horizons=DEFAULT_HORIZONS, workers=None, same_session=True):
+    files = discover_symbols(data_dir)
+    if symbols:
+        files = {s.upper(): files[s.upper()] for s in symbols if s.upper() in files}
+    if not files:
+        raise ValueError(f"No bar files found in {data_dir}")
+    horizons = tuple(sorted(set(horizons)))
+    tasks = [(symbol, path, horizons, same_session) for symbol, path in files.items()]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        partials = [r for r in executor.map(_evaluate_file, tasks, chunksize=chunksize) if not r.empty]
+    if not partials:
+        return pd.DataFrame(), pd.DataFrame()
+    stats = pd.concat(partials, ignore_index=True)
+
+    summary = summarize(stats, horizons, ['Signal', 'Direction'])
+    pattern_names = [name for name, _ in PATTERN_CHAIN_1 + PATTERN_CHAIN_2]
+    calibration = summarize(stats[stats['Signal'].isin(pattern_names)], horizons, ['Signal', 'Direction', 'Confidence'])
+    return summary, calibration.sort_index()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the dashboard's recommendation signals on stored OHLCV bars")
+    parser.add_argument('data_dir', help="Directory with one Parquet/CSV bar file per symbol")
+    parser.add_argument('--symbols', nargs='*', help="Limit the backtest to these symbols")
+    parser.add_argument('--horizons', nargs='*', type=int, default=list(DEFAULT_HORIZONS), help="Forward return horizons in bars")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--cross-session', action='store_true', help="Allow forward returns to span trading days")
+    parser.add_argument('--output', help="Write <output>_summary.csv and <output>_calibration.csv")
+    args = parser.parse_args()
+
+    start = time.time()
+    summary, calibration = run_backtest(args.data_dir, args.symbols, args.horizons, args.workers, not args.cross_session)
+    pd.set_option('display.width', 200)
+    print("Signal Summary")
+    print(summary.to_string())
+    print("\nConfidence Calibration")
+    print(calibration.to_string())
+    print(f"\nCompleted in {time.time() - start:.1f}s")
+    if args.output:
+        summary.to_csv(f"{args.output}_summary.csv")
+        calibration.to_csv(f"{args.output}_calibration.csv")
+
+if __name__ == '__main__':
+    main()
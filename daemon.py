@@ -0,0 +1,191 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_pool
+import scheduler
+
+# Headless watchlist monitor: fetches each symbol when its next candle is due (see scheduler.py),
+# retrying failed fetches after refresh_interval seconds, and appends closed bars to
+# {output_dir}/bars/{SYMBOL}.csv (readable by backtest.py and export.py --data-dir) and
+# alerts to {output_dir}/alerts.jsonl. Due symbols are fetched concurrently over the shared
+# connection pools in http_pool. Only the standard library, scheduler and http_pool are imported
+# at startup; stock_core (pandas, numpy) is loaded on the first cycle.
+#
+# Example config (JSON):
+#   {"symbols": {"AAPL": "5m", "MSFT": "1m"}, "extended_hours": false,
+#    "refresh_interval": 60, "data_source": "Yahoo Finance", "output_dir": "monitor_output",
+#    "price_freshness": null, "fetch_workers": 4,
+#    "http_pool": {"pool_size": 10, "read_timeout": 15, "gzip": true}}
+# "symbols" may also be a plain list, in which case every symbol uses "interval". "data_source" is
+# "Yahoo Finance", "Polygon.io" or "Auto (Hedged)" (see failover.py); the Polygon.io key can also
+# come from the POLYGON_API_KEY environment variable.
+# "price_freshness" (a fraction of the candle, e.g. 0.25; null for off) also refetches the forming
+# bar that often while the market is open, at most once a minute.
+DEFAULT_CONFIG = {
+    'symbols': {},
+    'interval': '5m',
+    'extended_hours': False,
+    'refresh_interval': 60,
+    'price_freshness': None,
+    'data_source': 'Yahoo Finance',
+    'polygon_api_key': '',
+    'output_dir': 'monitor_output',
+    'fetch_workers': 4,
+    'http_pool': {},
+}
+
+logger = logging.getLogger('daemon')
+
+def load_config(path):
+    with open(path) as f:
+        config = {**DEFAULT_CONFIG, **json.load(f)}
+    symbols = config['symbols']
+    if not isinstance(symbols, dict):
+        symbols = {symbol: config['interval'] for symbol in symbols}
+    config['symbols'] = {symbol.upper(): interval for symbol, interval in symbols.items()}
+    if not config['symbols']:
+        raise ValueError(f"No symbols configured in {path}")
+    if config['data_source'] in ('Polygon.io', 'Auto (Hedged)') and not config['polygon_api_key']:
+        config['polygon_api_key'] = os.environ.get('POLYGON_API_KEY', '')
+    return config
+
+class Monitor:
+    def __init__(self, config):
+        self.config = config
+        self.bars_dir = os.path.join(config['output_dir'], 'bars')
+        self.alerts_path = os.path.join(config['output_dir'], 'alerts.jsonl')
+        os.makedirs(self.bars_dir, exist_ok=True)
+        self.api_calls = []
+        self.last_written = {}
+        self.seen_alerts = {}
+        self.schedule = {}
+        self.core = None
+        # Kept for the life of the monitor so each worker's connections are reused across cycles
+        self.executor = ThreadPoolExecutor(max_workers=max(1, config['fetch_workers']), thread_name_prefix='fetch')
+
+    def _bars_path(self, symbol):
+        return os.path.join(self.bars_dir, f"{symbol}.csv")
+
+    # Timestamp of the last bar already on disk, so a restart doesn't duplicate rows
+    def _last_written(self, symbol):
+        if symbol not in self.last_written:
+            last = None
+            path = self._bars_path(symbol)
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                with open(path, 'rb') as f:
+                    f.seek(max(0, os.path.getsize(path) - 4096))
+                    tail = f.read().decode(errors='ignore').strip().splitlines()
+                if tail and not tail[-1].startswith('Timestamp'):
+                    import pandas as pd
+                    last = pd.Timestamp(tail[-1].split(',', 1)[0])
+            self.last_written[symbol] = last
+        return self.last_written[symbol]
+
+    def fetch(self, symbol, interval):
+        config = self.config
+        if config['data_source'] == 'Auto (Hedged)':
+            import failover
+            return failover.get_data(symbol, interval, config['polygon_api_key'], config['extended_hours'],
+                                     api_calls=self.api_calls)
+        if config['data_source'] == 'Polygon.io':
+            return self.core.get_polygon_data(symbol, interval, config['polygon_api_key'],
+                                              config['extended_hours'], api_calls=self.api_calls)
+        return self.core.get_stock_data(symbol, interval, config['extended_hours'])
+
+    # The newest bar is closed once its interval has elapsed or its session has ended
+    def _bar_closed(self, bar, interval, now):
+        return bar + scheduler.INTERVAL_SECONDS[interval] <= now or \
+            not scheduler.is_trading(now, self.config['extended_hours'])
+
+    # Append bars that have closed since the last write, leaving out a newest bar still forming
+    def write_bars(self, symbol, df, interval, now=None):
+        now = time.time() if now is None else now
+        closed = df if self._bar_closed(df.index[-1].timestamp(), interval, now) else df.iloc[:-1]
+        last = self._last_written(symbol)
+        if last is not None:
+            closed = closed[closed.index > last]
+        if closed.empty:
+            return 0
+        path = self._bars_path(symbol)
+        header = not os.path.exists(path) or os.path.getsize(path) == 0
+        closed[['Open', 'High', 'Low', 'Close', 'Volume']].to_csv(path, mode='a', header=header, index_label='Timestamp')
+        self.last_written[symbol] = closed.index[-1]
+        return len(closed)
+
+    # Append alerts not already reported for the current bar
+    def write_alerts(self, symbol, stock_info):
+        alerts = self.core.generate_alerts(symbol, stock_info['change_pct'], stock_info['volume_change_pct'], stock_info['data'])
+        bar = stock_info['timestamp']
+        previous_bar, seen = self.seen_alerts.get(symbol, (None, set()))
+        if previous_bar != bar:
+            seen = set()
+        new = [alert for alert in alerts if alert not in seen]
+        self.seen_alerts[symbol] = (bar, seen | set(new))
+        if new:
+            with open(self.alerts_path, 'a') as f:
+                for alert in new:
+                    f.write(json.dumps({'symbol': symbol, 'bar': bar, 'price': float(stock_info['price']),
+                                        'alert': alert, 'logged_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')}) + '\n')
+                    logger.warning(alert)
+        return len(new)
+
+    def run_cycle(self):
+        if self.core is None:
+            import stock_core
+            self.core = stock_core
+        config = self.config
+        due = scheduler.due_symbols(self.schedule, list(config['symbols']))
+        if not due:
+            return
+        # Calls that may go to Polygon.io stay sequential so the 5 calls/minute limiter sees each one
+        if config['data_source'] == 'Yahoo Finance':
+            results = list(self.executor.map(lambda symbol: self.fetch(symbol, config['symbols'][symbol]), due))
+        else:
+            results = [self.fetch(symbol, config['symbols'][symbol]) for symbol in due]
+        for symbol, stock_info in zip(due, results):
+            interval = config['symbols'][symbol]
+            if stock_info is None:
+                scheduler.defer(self.schedule, symbol, config['refresh_interval'])
+                continue
+            scheduler.record_fetch(self.schedule, symbol, stock_info['data'].index[-1].timestamp(), interval,
+                                   extended_hours=config['extended_hours'],
+                                   data_source=stock_info.get('source', config['data_source']),
+                                   max_gap=scheduler.freshness_gap(interval, config['price_freshness']))
+            written = self.write_bars(symbol, stock_info['data'], interval)
+            self.write_alerts(symbol, stock_info)
+            logger.info(f"{symbol}: {stock_info['price']:.2f} ({stock_info['change_pct']:+.3f}%), {written} new bars")
+        for row in http_pool.pool_stats():
+            logger.debug(f"HTTP pool {row}")
+
+    def run(self, once=False):
+        while True:
+            self.run_cycle()
+            if once:
+                return
+            time.sleep(scheduler.seconds_until_due(self.schedule, list(self.config['symbols'])))
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor a watchlist without the dashboard, writing bars and alerts to disk")
+    parser.add_argument('config', help="JSON config file")
+    parser.add_argument('--once', action='store_true', help="Run a single cycle and exit")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    try:
+        config = load_config(args.config)
+        http_pool.configure(**config['http_pool'])
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    logger.info(f"Monitoring {', '.join(config['symbols'])} from {config['data_source']} ({scheduler.market_session()} session)")
+    try:
+        Monitor(config).run(once=args.once)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+
+if __name__ == '__main__':
+    main()
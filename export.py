@@ -0,0 +1,192 @@
+import argparse
+import gzip
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import http_pool
+import indicators
+import stock_core
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Snapshot export of the watchlist: bar history with indicators, or detected patterns.
+# Exports are produced as a stream of byte chunks, one symbol at a time, so a large
+# multi-symbol export never holds the whole file in memory.
+EXPORT_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+    'csv.gz': ('csv.gz', 'application/gzip'),
+}
+EXPORT_KINDS = ('bars', 'patterns')
+EXPORT_COLUMNS = {
+    'bars': ['Symbol', 'Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume', 'RSI (14)', 'SMA (50)'],
+    'patterns': ['Symbol', 'Timestamp', 'Pattern', 'Signal', 'Details', 'Confidence'],
+}
+TEXT_COLUMNS = ('Symbol', 'Pattern', 'Signal', 'Details')
+LOCAL_TZ = 'America/New_York'
+
+# File-like sink that hands out what has been written so far; tell() keeps counting
+# across drains so Parquet/Arrow writers record correct offsets
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _timestamps(index):
+    index = pd.DatetimeIndex(index)
+    return index.tz_convert(LOCAL_TZ) if index.tz is not None else index.tz_localize(LOCAL_TZ)
+
+# Bars with RSI and 50-period SMA for one symbol
+def bars_frame(symbol, df):
+    close = df['Close'].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        'Symbol': symbol,
+        'Timestamp': _timestamps(df.index),
+        'Open': df['Open'].to_numpy(dtype=np.float64),
+        'High': df['High'].to_numpy(dtype=np.float64),
+        'Low': df['Low'].to_numpy(dtype=np.float64),
+        'Close': close,
+        'Volume': df['Volume'].to_numpy(dtype=np.float64),
+        'RSI (14)': indicators.rsi(close),
+        'SMA (50)': indicators.sma(close, 50),
+    })
+
+# Detected candlestick patterns for one symbol
+def patterns_frame(symbol, df):
+    patterns = stock_core.pattern_table(df)
+    patterns.insert(0, 'Symbol', symbol)
+    patterns['Timestamp'] = _timestamps(patterns['Timestamp'])
+    patterns['Confidence'] = patterns['Confidence'].astype(np.float64)
+    return patterns
+
+def _frames(frames, kind):
+    build = bars_frame if kind == 'bars' else patterns_frame
+    for symbol, df in frames.items() if hasattr(frames, 'items') else frames:
+        if df is not None and not df.empty:
+            frame = build(symbol, df)
+            if not frame.empty:
+                yield frame
+
+# Schema of an export with no rows, so Parquet/Arrow readers still get a valid, typed file
+def _empty_schema(kind):
+    def field_type(col):
+        if col == 'Timestamp':
+            return pa.timestamp('ns', tz=LOCAL_TZ)
+        return pa.string() if col in TEXT_COLUMNS else pa.float64()
+    return pa.schema([(col, field_type(col)) for col in EXPORT_COLUMNS[kind]])
+
+# Yield the export of {symbol: OHLCV DataFrame} (or an iterable of pairs) as byte chunks
+def iter_export(frames, kind='bars', fmt='parquet'):
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Unknown export kind '{kind}'; choose from {', '.join(EXPORT_KINDS)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; choose from {', '.join(EXPORT_FORMATS)}")
+    if fmt != 'csv.gz' and pa is None:
+        raise ImportError("Parquet/Arrow export requires pyarrow (pip install pyarrow)")
+
+    sink = _ChunkSink()
+    if fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=sink, mode='wb') as gz:
+            header = True
+            for frame in _frames(frames, kind):
+                gz.write(frame.to_csv(index=False, header=header).encode())
+                header = False
+                yield sink.drain()
+            if header:
+                # Nothing matched; still write the header row
+                gz.write(pd.DataFrame(columns=EXPORT_COLUMNS[kind]).to_csv(index=False).encode())
+        yield sink.drain()
+        return
+
+    writer = None
+    for frame in _frames(frames, kind):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            schema = table.schema.remove_metadata()
+            writer = pq.ParquetWriter(sink, schema) if fmt == 'parquet' else pa.ipc.new_file(sink, schema)
+        writer.write_table(table.cast(schema))
+        yield sink.drain()
+    if writer is None:
+        schema = _empty_schema(kind)
+        writer = pq.ParquetWriter(sink, schema) if fmt == 'parquet' else pa.ipc.new_file(sink, schema)
+    writer.close()
+    yield sink.drain()
+
+# Stream the export to a file on disk
+def write_export(frames, path, kind='bars', fmt='parquet'):
+    with open(path, 'wb') as f:
+        for chunk in iter_export(frames, kind, fmt):
+            f.write(chunk)
+
+# Stream the export into a rewound temporary file for deferred download buttons; it is opened
+# unbuffered (a raw FileIO) because st.download_button rejects buffered file objects
+def export_file(frames, kind='bars', fmt='parquet'):
+    f = tempfile.TemporaryFile(buffering=0)
+    for chunk in iter_export(frames, kind, fmt):
+        f.write(chunk)
+    f.seek(0)
+    return f
+
+# Default download file name, e.g. watchlist_bars.parquet
+def export_file_name(prefix, kind, fmt):
+    return f"{prefix}_{kind}.{EXPORT_FORMATS[fmt][0]}"
+
+def export_mime(fmt):
+    return EXPORT_FORMATS[fmt][1]
+
+def _fetch_bars(symbol, interval, period):
+    df = http_pool.yahoo_ticker(symbol).history(period=period, interval=interval, timeout=http_pool.SETTINGS['read_timeout'])
+    return df if not df.empty else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Export watchlist bars, indicators and candlestick patterns without the dashboard")
+    parser.add_argument('output', help="Output file path")
+    parser.add_argument('--symbols', nargs='*', help="Symbols to fetch from Yahoo Finance")
+    parser.add_argument('--data-dir', help="Read stored Parquet/CSV bar files instead of fetching")
+    parser.add_argument('--interval', default='5m', help="Yahoo Finance bar interval (default: 5m)")
+    parser.add_argument('--period', default='5d', help="Yahoo Finance history period (default: 5d)")
+    parser.add_argument('--kind', choices=EXPORT_KINDS, default='bars')
+    parser.add_argument('--format', dest='fmt', choices=list(EXPORT_FORMATS), default='parquet')
+    args = parser.parse_args()
+
+    if args.data_dir:
+        files = backtest.discover_symbols(args.data_dir)
+        if args.symbols:
+            files = {s.upper(): files[s.upper()] for s in args.symbols if s.upper() in files}
+        frames = ((symbol, backtest.load_bars(path)) for symbol, path in files.items())
+    elif args.symbols:
+        frames = ((s.upper(), _fetch_bars(s.upper(), args.interval, args.period)) for s in args.symbols)
+    else:
+        parser.error("Provide --symbols and/or --data-dir")
+
+    # Frames are loaded lazily, so only one symbol's bars are in memory at a time
+    write_export(frames, args.output, args.kind, args.fmt)
+    print(f"Wrote {args.kind} export to {args.output}")
+
+if __name__ == '__main__':
+    main()
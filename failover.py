@@ -0,0 +1,248 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import scheduler
+import stock_core
+
+# Hedged fetching across Yahoo Finance and Polygon.io. The source with the best recent latency,
+# data freshness and error rate is asked first; if it hasn't answered within the latency budget,
+# is rate-limited or fails, the other source is asked too and whichever returns data first wins.
+# A slow Yahoo Finance loser keeps running in the background only to update the health stats; a
+# Polygon.io loser is cancelled, or stopped before it spends another rate-limited call.
+# Workers never touch the caller's Polygon.io call list (for the dashboard it lives in session
+# state): they count calls on a private copy that get_data merges back on the calling thread.
+AUTO_SOURCE = 'Auto (Hedged)'
+SOURCES = ('Yahoo Finance', 'Polygon.io')
+LATENCY_BUDGET = 1.5
+FETCH_TIMEOUT = 30
+HEALTH_ALPHA = 0.2
+# Seconds of expected latency charged per second a source's newest bar lags behind the clock, so a
+# fast but delayed feed (the Polygon.io free tier is 15 minutes behind) doesn't become primary
+STALENESS_WEIGHT = 0.01
+FRAME_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+LOCAL_TZ = 'America/New_York'
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedged-fetch')
+_lock = threading.Lock()
+_health = {source: {'latency': None, 'error_rate': 0.0, 'staleness': None, 'requests': 0, 'wins': 0, 'hedges': 0,
+                    'in_flight': []} for source in SOURCES}
+
+# Messages logged by a fetch running on a hedge worker are held back, so a primary that fails
+# while the secondary succeeds doesn't surface an error for a refresh that worked
+_local = threading.local()
+
+class _CaptureFilter(logging.Filter):
+    def filter(self, record):
+        records = getattr(_local, 'records', None)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+stock_core.logger.addFilter(_CaptureFilter())
+
+# `lag` is how far the newest bar's end trails the clock while the market is trading, else None
+def _record(source, started, ok, lag=None):
+    seconds = time.perf_counter() - started
+    with _lock:
+        health = _health[source]
+        health['in_flight'].remove(started)
+        health['requests'] += 1
+        health['latency'] = seconds if health['latency'] is None else \
+            (1 - HEALTH_ALPHA) * health['latency'] + HEALTH_ALPHA * seconds
+        health['error_rate'] = (1 - HEALTH_ALPHA) * health['error_rate'] + HEALTH_ALPHA * (0.0 if ok else 1.0)
+        if lag is not None:
+            health['staleness'] = lag if health['staleness'] is None else \
+                (1 - HEALTH_ALPHA) * health['staleness'] + HEALTH_ALPHA * lag
+
+# Expected cost of asking a source first: recent latency (or the age of a request still
+# outstanding, so a stalled source is demoted before it answers) plus a charge for stale data,
+# inflated by its error rate
+def _score(source):
+    health = _health[source]
+    latency = health['latency']
+    if health['in_flight']:
+        latency = max(latency or 0.0, time.perf_counter() - health['in_flight'][0])
+    if latency is None:
+        return 0.0
+    return (latency + STALENESS_WEIGHT * (health['staleness'] or 0.0)) * (1 + 10 * health['error_rate'])
+
+# Sources ordered by health; sources never used yet keep their SOURCES order and go first
+def rank_sources(api_key=None):
+    sources = [source for source in SOURCES if source != 'Polygon.io' or api_key]
+    with _lock:
+        return sorted(sources, key=_score)
+
+def primary_source(api_key=None):
+    return rank_sources(api_key)[0]
+
+# Shared frame shape for both providers: float OHLCV in New York time, sorted, one row per
+# `interval` bar. Polygon.io returns minute bars, which are resampled into the same bins
+# get_yahoo_data uses (Yahoo Finance's hourly bars start on the half hour); Yahoo Finance
+# frames already have them.
+def normalize_frame(df, interval):
+    df = df[FRAME_COLUMNS].astype('float64')
+    index = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+    df.index = index.tz_convert(LOCAL_TZ).rename('Timestamp')
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    offset = '30min' if interval == '1h' else None
+    df = df.resample(f"{scheduler.INTERVAL_SECONDS[interval]}s", offset=offset).agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+    df.index = df.index.rename('Timestamp')
+    return df
+
+# get_yahoo_data/get_polygon_data's result recomputed from a normalized frame
+def _summary(df, source):
+    if len(df) < 2:
+        return None
+    current_price, previous_price = df['Close'].iloc[-1], df['Close'].iloc[-2]
+    current_volume, previous_volume = df['Volume'].iloc[-1], df['Volume'].iloc[-2]
+    return {
+        'data': df,
+        'price': current_price,
+        'volume': current_volume,
+        'open': df['Open'].iloc[-1],
+        'high': df['High'].iloc[-1],
+        'low': df['Low'].iloc[-1],
+        'change_pct': round(((current_price - previous_price) / previous_price) * 100, 3),
+        'volume_change_pct': round(((current_volume - previous_volume) / previous_volume) * 100, 3) if previous_volume > 0 else 0,
+        'timestamp': df.index[-1].strftime('%Y-%m-%d %H:%M:%S %Z'),
+        'source': source,
+    }
+
+# A fetch dropped after another source won is neither a failure nor a latency sample
+def _forget(source, started):
+    with _lock:
+        _health[source]['in_flight'].remove(started)
+
+def _fetch(source, symbol, interval, api_key, extended_hours, api_calls, cancelled):
+    if cancelled.is_set():
+        return None, []
+    _local.records = []
+    started = time.perf_counter()
+    with _lock:
+        _health[source]['in_flight'].append(started)
+    try:
+        if source == 'Polygon.io':
+            result = stock_core.get_polygon_data(symbol, interval, api_key, extended_hours, api_calls=api_calls,
+                                                 cancelled=cancelled)
+        else:
+            result = stock_core.get_yahoo_data(symbol, interval, extended_hours)
+        if result is not None:
+            result = _summary(normalize_frame(result['data'], interval), source)
+    except Exception as e:
+        stock_core.logger.error(f"Error fetching {source} data for {symbol}: {str(e)}")
+        result = None
+    finally:
+        records, _local.records = _local.records, None
+    if result is None and cancelled.is_set():
+        _forget(source, started)
+        return None, records
+    lag = None
+    now = time.time()
+    if result is not None and scheduler.is_trading(now, extended_hours):
+        lag = max(0.0, now - result['data'].index[-1].timestamp() - scheduler.INTERVAL_SECONDS[interval])
+    _record(source, started, result is not None, lag)
+    return result, records
+
+def _replay(records):
+    for record in records:
+        stock_core.logger.handle(record)
+
+# Fetch a symbol from the healthiest source, hedging to the other one when the first is slow,
+# rate-limited or fails. Returns get_yahoo_data/get_polygon_data's dict plus 'source', or None.
+def get_data(symbol, interval, api_key=None, extended_hours=False, api_calls=None, latency_budget=LATENCY_BUDGET):
+    if api_calls is None:
+        api_calls = stock_core._polygon_api_calls
+    queue = rank_sources(api_key)
+    if 'Polygon.io' in queue and not stock_core.check_polygon_rate_limit(api_calls):
+        # Rate-limited: don't spend a call we know will be refused
+        queue.remove('Polygon.io')
+
+    pending = {}
+    failures = []
+    # Polygon.io fetch in flight: its future, private call list, launch time and cancel event
+    polygon = {}
+    def launch(hedge=True):
+        source = queue.pop(0)
+        calls = None
+        cancelled = threading.Event()
+        if source == 'Polygon.io':
+            with stock_core._polygon_calls_lock:
+                calls = list(api_calls)
+            polygon.update(calls=calls, launched=time.time(), cancelled=cancelled)
+        future = _executor.submit(_fetch, source, symbol, interval, api_key, extended_hours, calls, cancelled)
+        pending[future] = source
+        if source == 'Polygon.io':
+            polygon['future'] = future
+        if hedge:
+            with _lock:
+                _health[source]['hedges'] += 1
+
+    # Calls the Polygon.io worker has made so far, from its private list
+    def polygon_calls():
+        with stock_core._polygon_calls_lock:
+            return [t for t in polygon['calls'] if t >= polygon['launched']]
+
+    # Charge the caller for the Polygon.io fetch; a worker still running is told to stop and
+    # charged one more call for the request it may have in flight
+    def settle_polygon():
+        future = polygon.get('future')
+        if future is None:
+            return
+        polygon['cancelled'].set()
+        if future.done():
+            calls = polygon_calls()
+        elif future.cancel():
+            calls = []
+        else:
+            calls = polygon_calls() + [time.time()]
+        if calls:
+            stock_core.record_polygon_calls(api_calls, *calls)
+
+    try:
+        launch(hedge=False)
+        deadline = time.monotonic() + FETCH_TIMEOUT
+        while pending:
+            # Wait for the first answer, but only up to the latency budget while another source is left
+            timeout = latency_budget if queue else max(0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if queue:
+                    launch()
+                    continue
+                break
+            for future in done:
+                source = pending.pop(future)
+                result, records = future.result()
+                if result is not None:
+                    with _lock:
+                        _health[source]['wins'] += 1
+                    _replay(records)
+                    return result
+                failures.append(records)
+            if queue:
+                launch()
+
+        for records in failures:
+            _replay(records)
+        if pending:
+            stock_core.logger.error(f"Timed out fetching {symbol} from {', '.join(pending.values())}")
+        return None
+    finally:
+        settle_polygon()
+
+# One row per source for display
+def health_stats():
+    with _lock:
+        return [{
+            'Source': source,
+            'Avg Latency (ms)': round(health['latency'] * 1000, 1) if health['latency'] is not None else None,
+            'Error Rate (%)': round(health['error_rate'] * 100, 1),
+            'Data Lag (s)': round(health['staleness'], 1) if health['staleness'] is not None else None,
+            'Requests': health['requests'],
+            'Wins': health['wins'],
+            'Hedges': health['hedges'],
+        } for source, health in _health.items()]
@@ -0,0 +1,197 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Process-wide HTTP clients shared by every fetch, so refreshes reuse kept-alive connections
+# instead of paying TCP/TLS setup on each call. There is one pool per data source and API key:
+#   'Polygon.io'    a polygon RESTClient whose urllib3 pools hold up to `pool_size` connections
+#   'Yahoo Finance' one HTTP session handed to every yf.Ticker (yfinance routes all requests
+#                   through a single session), plus a cache of Ticker objects per symbol
+# Settings are changed with configure(); existing clients are closed and rebuilt on next use.
+SETTINGS = {
+    'pool_size': 10,
+    'connect_timeout': 5.0,
+    'read_timeout': 15.0,
+    'gzip': True,
+}
+
+_lock = threading.Lock()
+_pools = {}
+
+def configure(**settings):
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown HTTP pool setting(s): {', '.join(sorted(unknown))}")
+    with _lock:
+        SETTINGS.update(settings)
+        _close_pools()
+
+def close_all():
+    with _lock:
+        _close_pools()
+
+def _close_pools():
+    for pool in _pools.values():
+        try:
+            pool['close']()
+        except Exception:
+            pass
+    _pools.clear()
+
+def _new_stats():
+    return {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'last_seconds': None, 'created': time.time()}
+
+def _pool(source, api_key, build):
+    key = (source, api_key or '')
+    with _lock:
+        if key not in _pools:
+            _pools[key] = {**build(), 'stats': _new_stats()}
+        return _pools[key]
+
+def _polygon_pool(api_key):
+    from polygon import RESTClient
+    client = RESTClient(api_key=api_key, connect_timeout=SETTINGS['connect_timeout'],
+                        read_timeout=SETTINGS['read_timeout'])
+    # Size the per-host pools and don't block when all connections are busy
+    client.client.connection_pool_kw.update(maxsize=SETTINGS['pool_size'], block=False)
+    if not SETTINGS['gzip']:
+        client.headers['Accept-Encoding'] = 'identity'
+    return {'client': client, 'close': client.client.clear}
+
+# curl_cffi sessions keep one Curl handle (and so one connection cache) per thread by default, and
+# Streamlit runs every rerun on a new thread. This session instead checks a handle out of a shared
+# free list for each request, so kept-alive connections outlive the thread that opened them while
+# concurrent requests still get a handle each. This relies on Session internals (the
+# use_thread_local_curl flag, `_curl`, `_closed` and the `curl` property), so curl_cffi is pinned to
+# the range it was tested on in requirements.txt and _yahoo_session falls back if they have changed.
+def _pooled_curl_session_class():
+    from curl_cffi import Curl
+    from curl_cffi import requests as curl_requests
+
+    class PooledCurlSession(curl_requests.Session):
+        def __init__(self, **kwargs):
+            super().__init__(use_thread_local_curl=False, **kwargs)
+            self._handles = [self._curl]
+            self._handles_lock = threading.Lock()
+            self._checked_out = threading.local()
+            self._all_handles = [self._curl]
+
+        @property
+        def curl(self):
+            handle = getattr(self._checked_out, 'handle', None)
+            return handle if handle is not None else self._curl
+
+        def request(self, *args, **kwargs):
+            with self._handles_lock:
+                if self._handles:
+                    handle = self._handles.pop()
+                else:
+                    handle = Curl(debug=self.debug)
+                    self._all_handles.append(handle)
+            self._checked_out.handle = handle
+            try:
+                return super().request(*args, **kwargs)
+            finally:
+                self._checked_out.handle = None
+                with self._handles_lock:
+                    self._handles.append(handle)
+
+        def close(self):
+            self._closed = True
+            with self._handles_lock:
+                for handle in self._all_handles:
+                    handle.close()
+                self._handles = []
+
+    return PooledCurlSession
+
+def _yahoo_session():
+    try:
+        from curl_cffi import CurlOpt
+        session = _pooled_curl_session_class()(impersonate='chrome',
+                                               timeout=(SETTINGS['connect_timeout'], SETTINGS['read_timeout']),
+                                               curl_options={CurlOpt.MAXCONNECTS: SETTINGS['pool_size']})
+    except (ImportError, TypeError, AttributeError):
+        # curl_cffi missing, or a version whose Session internals differ from what the pool expects
+        import requests
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=SETTINGS['pool_size'],
+                                                pool_maxsize=SETTINGS['pool_size'])
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    if not SETTINGS['gzip']:
+        session.headers['Accept-Encoding'] = 'identity'
+    return session
+
+def _yahoo_pool():
+    session = _yahoo_session()
+    return {'client': session, 'tickers': {}, 'close': session.close}
+
+# Shared polygon RESTClient for an API key
+def polygon_client(api_key):
+    return _pool('Polygon.io', api_key, lambda: _polygon_pool(api_key))['client']
+
+# Cached yf.Ticker bound to the shared Yahoo Finance session
+def yahoo_ticker(symbol):
+    import yfinance as yf
+    pool = _pool('Yahoo Finance', None, _yahoo_pool)
+    with _lock:
+        ticker = pool['tickers'].get(symbol)
+        if ticker is None:
+            ticker = pool['tickers'][symbol] = yf.Ticker(symbol, session=pool['client'])
+    return ticker
+
+# Time a request (or a paginated sequence of them) against a pool's stats
+@contextmanager
+def track(source, api_key=None):
+    stats = _pools.get((source, api_key or ''), {}).get('stats')
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - started
+            with _lock:
+                stats['requests'] += 1
+                stats['errors'] += failed
+                stats['total_seconds'] += elapsed
+                stats['last_seconds'] = elapsed
+
+def _connection_counts(pool):
+    manager = getattr(pool['client'], 'client', None)
+    if manager is None:
+        return None, None
+    opened = idle = 0
+    for key in list(manager.pools.keys()):
+        connection_pool = manager.pools.get(key)
+        if connection_pool is not None:
+            opened += connection_pool.num_connections
+            if connection_pool.pool is not None:
+                # Unused slots in the queue are None placeholders
+                idle += sum(connection is not None for connection in list(connection_pool.pool.queue))
+    return opened, idle
+
+# One row per pool: request count, error count, latency and (for Polygon.io) connections opened
+def pool_stats():
+    rows = []
+    with _lock:
+        pools = list(_pools.items())
+    for (source, _), pool in pools:
+        stats = pool['stats']
+        opened, idle = _connection_counts(pool)
+        rows.append({
+            'Source': source,
+            'Requests': stats['requests'],
+            'Errors': stats['errors'],
+            'Avg Latency (ms)': round(stats['total_seconds'] / stats['requests'] * 1000, 1) if stats['requests'] else None,
+            'Last Latency (ms)': round(stats['last_seconds'] * 1000, 1) if stats['last_seconds'] is not None else None,
+            'Connections Opened': opened,
+            'Idle Connections': idle,
+            'Cached Tickers': len(pool.get('tickers', ())),
+            'Pool Size': SETTINGS['pool_size'],
+        })
+    return rows
@@ -0,0 +1,123 @@
+import numba
+import numpy as np
+
+# numba kernels behind indicators.py (single pass per row). Rows are short per-symbol series,
+# so the kernels run serially: parallel=True gained nothing and its threading layer hangs
+# backtest.py's forked worker pool at exit.
+# Imported by indicators only when a kernel is first used, so numba's import and
+# cache loading stay off the startup path.
+
+@numba.njit(cache=True)
+def sma_kernel(x, window, min_periods, out):
+    for r in range(x.shape[0]):
+        total = 0.0
+        count = 0
+        for t in range(x.shape[1]):
+            val = x[r, t]
+            if not np.isnan(val):
+                total += val
+                count += 1
+            if t >= window:
+                old = x[r, t - window]
+                if not np.isnan(old):
+                    total -= old
+                    count -= 1
+            out[r, t] = total / count if count >= min_periods else np.nan
+
+@numba.njit(cache=True)
+def ewm_kernel(x, alpha, out):
+    for r in range(x.shape[0]):
+        prev = np.nan
+        for t in range(x.shape[1]):
+            val = x[r, t]
+            if not np.isnan(val):
+                prev = val if np.isnan(prev) else prev + alpha * (val - prev)
+            out[r, t] = prev
+
+@numba.njit(cache=True)
+def rsi_kernel(x, periods, out):
+    for r in range(x.shape[0]):
+        gains = np.zeros(periods)
+        losses = np.zeros(periods)
+        sum_gain = 0.0
+        sum_loss = 0.0
+        for t in range(x.shape[1]):
+            delta = x[r, t] - x[r, t - 1] if t > 0 else np.nan
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            slot = t % periods
+            sum_gain += gain - gains[slot]
+            sum_loss += loss - losses[slot]
+            gains[slot] = gain
+            losses[slot] = loss
+            count = min(t + 1, periods)
+            avg_loss = sum_loss / count
+            rs = (sum_gain / count) / (avg_loss if avg_loss != 0 else 1e-10)
+            out[r, t] = 100 - (100 / (1 + rs))
+
+@numba.njit(cache=True)
+def rsi_wilder_kernel(x, periods, out):
+    for r in range(x.shape[0]):
+        avg_gain = 0.0
+        avg_loss = 0.0
+        out[r, 0] = np.nan
+        for t in range(1, x.shape[1]):
+            delta = x[r, t] - x[r, t - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if t < periods:
+                avg_gain += gain
+                avg_loss += loss
+                out[r, t] = np.nan
+                continue
+            if t == periods:
+                avg_gain = (avg_gain + gain) / periods
+                avg_loss = (avg_loss + loss) / periods
+            else:
+                avg_gain = (avg_gain * (periods - 1) + gain) / periods
+                avg_loss = (avg_loss * (periods - 1) + loss) / periods
+            rs = avg_gain / (avg_loss if avg_loss != 0 else 1e-10)
+            out[r, t] = 100 - (100 / (1 + rs))
+
+@numba.njit(cache=True)
+def rolling_extreme_kernel(x, window, min_periods, sign, out):
+    # Monotonic deque of indices kept in a ring buffer; its front is the window extreme
+    for r in range(x.shape[0]):
+        deque = np.empty(window, np.int64)
+        head = 0
+        size = 0
+        count = 0
+        for t in range(x.shape[1]):
+            if size > 0 and deque[head] <= t - window:
+                head = (head + 1) % window
+                size -= 1
+            if t >= window and not np.isnan(x[r, t - window]):
+                count -= 1
+            val = x[r, t]
+            if not np.isnan(val):
+                count += 1
+                while size > 0 and sign * x[r, deque[(head + size - 1) % window]] <= sign * val:
+                    size -= 1
+                deque[(head + size) % window] = t
+                size += 1
+            out[r, t] = x[r, deque[head]] if size > 0 and count >= min_periods else np.nan
+
+@numba.njit(cache=True)
+def breakout_levels_kernel(high, low, volume, lookback, resistance, support, avg_volume):
+    n = high.shape[1]
+    for r in range(high.shape[0]):
+        hi = -np.inf
+        lo = np.inf
+        total = 0.0
+        count = 0
+        for t in range(max(0, n - lookback), n):
+            if high[r, t] > hi:
+                hi = high[r, t]
+            if low[r, t] < lo:
+                lo = low[r, t]
+            if not np.isnan(volume[r, t]):
+                total += volume[r, t]
+                count += 1
+        resistance[r] = hi if hi > -np.inf else np.nan
+        support[r] = lo if lo < np.inf else np.nan
+        avg_volume[r] = total / count if count > 0 else np.nan
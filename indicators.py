@@ -0,0 +1,165 @@
+import importlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# Indicator kernels shared by the dashboards and the backtest.
+# Every function takes a 1-D series or a 2-D symbol x time array and returns the same shape,
+# so a whole watchlist can be computed in one call. numba is optional; without it the
+# NumPy implementations below are used. The numba kernels live in indicator_kernels and
+# are imported on first use.
+USE_NUMBA = importlib.util.find_spec('numba') is not None
+
+def _kernels():
+    return importlib.import_module('indicator_kernels')
+
+def _as_2d(x):
+    arr = np.ascontiguousarray(x, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[np.newaxis, :], True
+    return arr, False
+
+def _finish(out, squeeze):
+    return out[0] if squeeze else out
+
+# NumPy implementations
+
+def _trailing_sums(x, window):
+    valid = ~np.isnan(x)
+    rows, n = x.shape
+    csum = np.zeros((rows, n + 1))
+    ccount = np.zeros((rows, n + 1))
+    np.cumsum(np.where(valid, x, 0.0), axis=1, out=csum[:, 1:])
+    np.cumsum(valid, axis=1, out=ccount[:, 1:])
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - window, 0)
+    return csum[:, end] - csum[:, start], ccount[:, end] - ccount[:, start]
+
+def _sma_numpy(x, window, min_periods):
+    total, count = _trailing_sums(x, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count >= min_periods, total / count, np.nan)
+
+def _ewm_numpy(x, alpha):
+    # The EMA recursion has no closed vectorized form; pandas' compiled ewm is the fast fallback
+    return pd.DataFrame(x.T).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy().T
+
+def _gains_losses(x):
+    delta = np.diff(x, axis=1, prepend=np.nan)
+    return np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    rs = avg_gain / np.where(avg_loss != 0, avg_loss, 1e-10)
+    return 100 - (100 / (1 + rs))
+
+def _rsi_numpy(x, periods):
+    gain, loss = _gains_losses(x)
+    return _rsi_from_averages(_sma_numpy(gain, periods, 1), _sma_numpy(loss, periods, 1))
+
+def _rsi_wilder_numpy(x, periods):
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] <= periods:
+        return out
+    gain, loss = _gains_losses(x)
+    averages = []
+    for values in (gain, loss):
+        seeded = values.copy()
+        seeded[:, :periods] = np.nan
+        seeded[:, periods] = values[:, 1:periods + 1].mean(axis=1)
+        averages.append(_ewm_numpy(seeded, 1 / periods))
+    out[:, periods:] = _rsi_from_averages(averages[0], averages[1])[:, periods:]
+    return out
+
+def _rolling_extreme_numpy(x, window, min_periods, is_max):
+    fill = -np.inf if is_max else np.inf
+    padded = np.concatenate((np.full((x.shape[0], window - 1), fill), np.where(np.isnan(x), fill, x)), axis=1)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+    out = windows.max(axis=2) if is_max else windows.min(axis=2)
+    _, count = _trailing_sums(x, window)
+    return np.where(count >= min_periods, out, np.nan)
+
+def _breakout_levels_numpy(high, low, volume, lookback):
+    resistance = np.fmax.reduce(high[:, -lookback:], axis=1)
+    support = np.fmin.reduce(low[:, -lookback:], axis=1)
+    recent = volume[:, -lookback:]
+    count = (~np.isnan(recent)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_volume = np.where(count > 0, np.nansum(recent, axis=1) / count, np.nan)
+    return resistance, support, avg_volume
+
+# Public API
+
+# Simple moving average (pandas rolling(window, min_periods).mean() semantics, NaNs skipped)
+def sma(x, window, min_periods=None):
+    arr, squeeze = _as_2d(x)
+    min_periods = max(1, window if min_periods is None else min_periods)
+    if USE_NUMBA:
+        out = np.empty_like(arr)
+        _kernels().sma_kernel(arr, window, min_periods, out)
+    else:
+        out = _sma_numpy(arr, window, min_periods)
+    return _finish(out, squeeze)
+
+# Exponential moving average (pandas ewm(span, adjust=False, ignore_na=True).mean() semantics)
+def ema(x, span):
+    arr, squeeze = _as_2d(x)
+    alpha = 2 / (span + 1)
+    if USE_NUMBA:
+        out = np.empty_like(arr)
+        _kernels().ewm_kernel(arr, alpha, out)
+    else:
+        out = _ewm_numpy(arr, alpha)
+    return _finish(out, squeeze)
+
+# RSI with simple-average gains/losses, identical to the dashboards' calculate_rsi
+def rsi(close, periods=14):
+    arr, squeeze = _as_2d(close)
+    if USE_NUMBA:
+        out = np.empty_like(arr)
+        _kernels().rsi_kernel(arr, periods, out)
+    else:
+        out = _rsi_numpy(arr, periods)
+    return _finish(out, squeeze)
+
+# RSI with Wilder's smoothing, seeded by the simple average of the first `periods` changes
+def rsi_wilder(close, periods=14):
+    arr, squeeze = _as_2d(close)
+    if USE_NUMBA:
+        out = np.empty_like(arr)
+        _kernels().rsi_wilder_kernel(arr, periods, out)
+    else:
+        out = _rsi_wilder_numpy(arr, periods)
+    return _finish(out, squeeze)
+
+def _rolling_extreme(x, window, min_periods, is_max):
+    arr, squeeze = _as_2d(x)
+    min_periods = max(1, window if min_periods is None else min_periods)
+    if USE_NUMBA:
+        out = np.empty_like(arr)
+        _kernels().rolling_extreme_kernel(arr, window, min_periods, 1.0 if is_max else -1.0, out)
+    else:
+        out = _rolling_extreme_numpy(arr, window, min_periods, is_max)
+    return _finish(out, squeeze)
+
+# Rolling maximum over the trailing window
+def rolling_max(x, window, min_periods=None):
+    return _rolling_extreme(x, window, min_periods, True)
+
+# Rolling minimum over the trailing window
+def rolling_min(x, window, min_periods=None):
+    return _rolling_extreme(x, window, min_periods, False)
+
+# Resistance (max high), support (min low) and average volume over the last `lookback` bars
+def breakout_levels(high, low, volume, lookback=20):
+    high, squeeze = _as_2d(high)
+    low, _ = _as_2d(low)
+    volume, _ = _as_2d(volume)
+    if USE_NUMBA:
+        resistance, support, avg_volume = (np.empty(high.shape[0]) for _ in range(3))
+        _kernels().breakout_levels_kernel(high, low, volume, lookback, resistance, support, avg_volume)
+    else:
+        resistance, support, avg_volume = _breakout_levels_numpy(high, low, volume, lookback)
+    if squeeze:
+        return resistance[0], support[0], avg_volume[0]
+    return resistance, support, avg_volume
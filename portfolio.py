@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+import indicators
+import scheduler
+
+# Aligned symbol x time close-price matrix for the Portfolio Overview tab.
+# Symbols can be watched on different intervals, so every frame is first resampled to the
+# coarsest one; aligning a 1h series onto 1m times would turn it into flat runs of zero returns.
+# The matrix is a plain dict kept in session state:
+#   'symbols'    list of symbols (matrix rows)
+#   'interval'   bar interval every symbol was resampled to
+#   'timestamps' int64 UTC nanoseconds, the union of every symbol's bar times (matrix columns)
+#   'close'      float64 array; each cell is the symbol's last close at or before that time
+#   'last_seen'  symbol -> timestamp of its newest bar, used to find what changed on refresh
+MAX_BARS = 5000
+LOCAL_TZ = 'America/New_York'
+
+def _bar_times(df):
+    return df.index.as_unit('ns').asi8
+
+# Coarsest of the symbols' intervals
+def common_interval(intervals):
+    return max(intervals, key=lambda interval: scheduler.INTERVAL_SECONDS[interval])
+
+# Closes of `df` in `interval` bars, binned the way the data sources bin them
+# (hourly bars start on the half hour)
+def _resample(df, interval):
+    offset = '30min' if interval == '1h' else None
+    return df['Close'].resample(f"{scheduler.INTERVAL_SECONDS[interval]}s", offset=offset).last().dropna()
+
+def _present(frames):
+    return {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+
+# Close series of every frame on the common interval; frames already on it aren't re-binned.
+# With `since` (the start of a common-interval bar) only bars from that bar on are kept.
+def _common_frames(frames, intervals, since=None):
+    frames = _present(frames)
+    if not frames:
+        return None, frames
+    interval = common_interval(intervals[symbol] for symbol in frames)
+    closes = {}
+    for symbol, df in frames.items():
+        if since is not None:
+            df = df.iloc[int(np.searchsorted(_bar_times(df), since)):]
+        if intervals[symbol] == interval:
+            closes[symbol] = df['Close'].dropna()
+        else:
+            closes[symbol] = _resample(df, interval)
+    return interval, closes
+
+# Latest close at or before each grid time; `carry` where the series has no earlier bar
+def _as_of(close, grid, carry=np.nan):
+    times = _bar_times(close)
+    closes = close.to_numpy(dtype=np.float64)
+    pos = np.searchsorted(times, grid, side='right') - 1
+    return np.where(pos >= 0, closes[np.maximum(pos, 0)], carry)
+
+# Build the matrix from scratch for {symbol: OHLCV DataFrame} and {symbol: interval}
+def build_price_matrix(frames, intervals, max_bars=MAX_BARS):
+    interval, frames = _common_frames(frames, intervals)
+    return _build(frames, interval, max_bars)
+
+def _build(frames, interval, max_bars):
+    symbols = list(frames)
+    if not symbols:
+        return None
+    grid = np.unique(np.concatenate([_bar_times(df) for df in frames.values()]))[-max_bars:]
+    close = np.empty((len(symbols), len(grid)))
+    for row, symbol in enumerate(symbols):
+        close[row] = _as_of(frames[symbol], grid)
+    return {
+        'symbols': symbols,
+        'interval': interval,
+        'timestamps': grid,
+        'close': close,
+        'last_seen': {symbol: _bar_times(df)[-1] for symbol, df in frames.items()},
+        'max_bars': max_bars,
+    }
+
+# Fold refreshed frames into an existing matrix, touching only columns from the oldest
+# bar that may have changed (each symbol's previous last bar, which can still be forming)
+def update_price_matrix(matrix, frames, intervals, max_bars=MAX_BARS):
+    present = _present(frames)
+    interval = common_interval(intervals[symbol] for symbol in present) if present else None
+    if matrix is None or list(present) != matrix['symbols'] or matrix['interval'] != interval or \
+            matrix['max_bars'] != max_bars:
+        return build_price_matrix(present, intervals, max_bars)
+
+    # Only history from the oldest previous last bar on is re-binned
+    grid = matrix['timestamps']
+    start = min(matrix['last_seen'].values())
+    _, recent = _common_frames(present, intervals, since=start)
+    if any(series.empty for series in recent.values()):
+        # A frame lost the bars the matrix was built from
+        return build_price_matrix(present, intervals, max_bars)
+    fresh = np.unique(np.concatenate([_bar_times(series) for series in recent.values()]))
+    inside = fresh[fresh <= grid[-1]]
+    if len(np.setdiff1d(inside, grid, assume_unique=True)):
+        # A bar landed between existing columns; not worth splicing, rebuild instead
+        return build_price_matrix(present, intervals, max_bars)
+
+    appended = fresh[fresh > grid[-1]]
+    close = matrix['close']
+    if len(appended):
+        grid = np.concatenate((grid, appended))
+        close = np.concatenate((close, np.full((close.shape[0], len(appended)), np.nan)), axis=1)
+        if len(grid) > max_bars:
+            grid = grid[-max_bars:]
+            close = close[:, -max_bars:]
+
+    first = int(np.searchsorted(grid, start))
+    if first == 0:
+        # The history cap dropped every column before `start`, so there's nothing to carry forward
+        return build_price_matrix(present, intervals, max_bars)
+    for row, symbol in enumerate(matrix['symbols']):
+        carry = close[row, first - 1]
+        close[row, first:] = _as_of(recent[symbol], grid[first:], carry)
+
+    matrix['timestamps'] = grid
+    matrix['close'] = close
+    matrix['last_seen'] = {symbol: _bar_times(series)[-1] for symbol, series in recent.items()}
+    return matrix
+
+# Normalized performance, rolling volatility and rolling correlation over the last `lookback` columns.
+# Unlike the matrix these are recomputed on every call; it is a few vectorized passes over
+# `lookback` columns, which costs far less than keeping rolling sums in step with revised bars.
+def portfolio_analytics(matrix, window=30, lookback=390, benchmark=None):
+    symbols = matrix['symbols']
+    close = matrix['close'][:, -lookback:]
+    times = pd.to_datetime(matrix['timestamps'][-lookback:], utc=True).tz_convert(LOCAL_TZ)
+    rows = np.arange(len(symbols))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Performance relative to each symbol's first price in view (%)
+        first = np.argmax(~np.isnan(close), axis=1)
+        performance = (close / close[rows, first][:, np.newaxis] - 1) * 100
+
+        returns = np.full(close.shape, np.nan)
+        returns[:, 1:] = np.log(close[:, 1:] / close[:, :-1])
+        mean = indicators.sma(returns, window)
+        mean_sq = indicators.sma(returns ** 2, window)
+        variance = np.clip(mean_sq - mean ** 2, 0, None) * window / (window - 1)
+        std = np.sqrt(variance)
+
+        # Rolling correlation of every symbol against the benchmark in one pass
+        b = symbols.index(benchmark) if benchmark in symbols else 0
+        cross = indicators.sma(returns * returns[b], window)
+        covariance = (cross - mean * mean[b]) * window / (window - 1)
+        correlation = covariance / (std * std[b])
+
+        # Correlation matrix over the most recent window; missing returns count as no deviation
+        recent = returns[:, -window:]
+        valid = ~np.isnan(recent)
+        recent_mean = np.where(valid, recent, 0.0).sum(axis=1, keepdims=True) / valid.sum(axis=1, keepdims=True)
+        centered = np.where(valid, recent - recent_mean, 0.0)
+        scaled = centered / np.sqrt((centered ** 2).sum(axis=1, keepdims=True))
+        correlation_matrix = np.clip(scaled @ scaled.T, -1, 1)
+
+    return {
+        'symbols': symbols,
+        'timestamps': times,
+        'benchmark': symbols[b],
+        'performance': performance,
+        'volatility': std * 100,
+        'correlation': np.clip(correlation, -1, 1),
+        'correlation_matrix': correlation_matrix,
+    }
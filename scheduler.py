@@ -0,0 +1,145 @@
+import time
+from datetime import datetime, timedelta, time as dt_time
+
+import pytz
+
+# Per-symbol refresh scheduling. Instead of refetching every symbol on a fixed timer, each
+# symbol is fetched once its next candle should be available upstream: the candle boundary
+# after the newest bar, moved to the next session open when the market is closed, plus the
+# data source's delay. The schedule is a plain dict kept by the caller:
+#   schedule[symbol] = {'bar': epoch seconds of the newest bar fetched,
+#                       'delay': estimated seconds between a bar starting and it appearing upstream,
+#                       'floor': longest wait after a bar start that still found no new bar,
+#                       'due': epoch seconds of the next useful fetch,
+#                       'source': data source the delay was learned from}
+LOCAL_TZ = pytz.timezone('America/New_York')
+INTERVAL_SECONDS = {
+    '1m': 60, '2m': 120, '3m': 180, '5m': 300, '10m': 600, '15m': 900, '30m': 1800,
+    '45m': 2700, '1h': 3600, '2h': 7200, '3h': 10800, '4h': 14400,
+}
+SESSIONS = (
+    ('pre', dt_time(4, 0), dt_time(9, 30)),
+    ('regular', dt_time(9, 30), dt_time(16, 0)),
+    ('post', dt_time(16, 0), dt_time(20, 0)),
+)
+# Starting delay estimates; the Polygon.io free tier serves 15-minute delayed data
+DATA_DELAY = {'Yahoo Finance': 10, 'Polygon.io': 900}
+MIN_DELAY = 2
+MAX_DELAY = 1800
+MAX_WAIT = 3600
+# Shortest refetch gap for the forming bar when a price freshness fraction is set
+MIN_FRESHNESS_GAP = 60
+
+# 'pre', 'regular', 'post' or 'closed' at an epoch time (weekends are closed; exchange holidays are not tracked)
+def market_session(ts=None):
+    now = datetime.fromtimestamp(time.time() if ts is None else ts, LOCAL_TZ)
+    if now.weekday() >= 5:
+        return 'closed'
+    for name, start, end in SESSIONS:
+        if start <= now.time() < end:
+            return name
+    return 'closed'
+
+def is_trading(ts, extended_hours=False):
+    session = market_session(ts)
+    return session == 'regular' or (extended_hours and session in ('pre', 'post'))
+
+# Earliest time at or after `ts` when bars are produced
+def next_open(ts, extended_hours=False):
+    if is_trading(ts, extended_hours):
+        return ts
+    open_time = SESSIONS[0][1] if extended_hours else SESSIONS[1][1]
+    day = datetime.fromtimestamp(ts, LOCAL_TZ).date()
+    for offset in range(8):
+        candidate = LOCAL_TZ.localize(datetime.combine(day + timedelta(days=offset), open_time))
+        if candidate.weekday() < 5 and candidate.timestamp() > ts:
+            return candidate.timestamp()
+
+# End of the trading day containing `ts` (20:00 with extended hours, else the 16:00 close)
+def session_close(ts, extended_hours=False):
+    close_time = SESSIONS[-1][2] if extended_hours else SESSIONS[1][2]
+    day = datetime.fromtimestamp(ts, LOCAL_TZ).date()
+    return LOCAL_TZ.localize(datetime.combine(day, close_time)).timestamp()
+
+# Record a fetch whose newest bar starts at `last_bar` (epoch seconds) and schedule the next one.
+# Every fetch bounds the source's delay: the newest bar is out, so the delay is at most its age,
+# and the bar after it isn't, so the delay exceeds the time since that bar started. A fetch made
+# at its due time also probes: if the new bar was there the delay is lowered toward the known
+# lower bound, if not it backs off past the time already waited.
+# The newest bar of a session gets one more fetch once the session has closed, so its final
+# values aren't left until the next open. Optionally, while the market is trading, the forming
+# bar is also refetched at least every `max_gap` seconds (see freshness_gap; None fetches once per candle).
+def record_fetch(schedule, symbol, last_bar, interval, now=None, extended_hours=False,
+                 data_source='Yahoo Finance', max_gap=None):
+    now = time.time() if now is None else now
+    step = INTERVAL_SECONDS[interval]
+    entry = schedule.get(symbol)
+    if entry is not None and entry.get('source', data_source) != data_source:
+        # A different source served this fetch (failover); its delay has to be learned afresh
+        entry = None
+    if entry is None:
+        delay, floor = DATA_DELAY.get(data_source, DATA_DELAY['Yahoo Finance']), 0
+    else:
+        delay, floor = entry['delay'], entry['floor']
+
+    next_start = next_open(last_bar + step, extended_hours)
+    waited = now - next_start
+    age = now - last_bar
+    if entry is not None and now >= entry['due']:
+        if last_bar > entry['bar']:
+            delay = (delay + floor) / 2
+        elif 0 < waited < MAX_DELAY:
+            delay = max(delay, waited * 1.5 + MIN_DELAY)
+    if age < floor:
+        # The feed has sped up; forget the old lower bound
+        floor = 0
+    if 0 < waited < MAX_DELAY:
+        floor = max(floor, waited)
+    delay = min(max(delay, floor + MIN_DELAY), age, MAX_DELAY)
+    delay = max(delay, MIN_DELAY)
+
+    due = next_start + delay
+    if next_start > last_bar + step:
+        # The newest bar is the session's last; fetch its final values after the close
+        closed = min(last_bar + step, session_close(last_bar, extended_hours)) + delay
+        if closed > now:
+            due = closed
+    if due <= now:
+        if is_trading(now, extended_hours):
+            # The next bar is already overdue (upstream lag, halt or holiday); check back in a candle
+            due = now + step
+        else:
+            # Nothing new until the market reopens, e.g. a feed without pre/post-market bars
+            due = next_open(now, extended_hours) + delay
+    if max_gap is not None and is_trading(now, extended_hours):
+        due = min(due, now + max_gap)
+    schedule[symbol] = {'bar': last_bar, 'delay': delay, 'floor': floor, 'due': due, 'source': data_source}
+    return due
+
+# Refetch gap for the forming bar as a `fraction` of the candle, at least MIN_FRESHNESS_GAP;
+# None when the fraction is unset or the gap wouldn't come before the next candle anyway
+def freshness_gap(interval, fraction):
+    if not fraction:
+        return None
+    step = INTERVAL_SECONDS[interval]
+    gap = max(step * fraction, MIN_FRESHNESS_GAP)
+    return gap if gap < step else None
+
+# Push a symbol's next fetch back, e.g. after a failed fetch
+def defer(schedule, symbol, seconds, now=None):
+    now = time.time() if now is None else now
+    entry = schedule.setdefault(symbol, {'bar': 0, 'delay': DATA_DELAY['Yahoo Finance'], 'floor': 0})
+    entry['due'] = now + seconds
+
+# Symbols whose next bar is due (or that have never been fetched)
+def due_symbols(schedule, symbols, now=None):
+    now = time.time() if now is None else now
+    return [symbol for symbol in symbols if symbol not in schedule or schedule[symbol]['due'] <= now]
+
+# Seconds until the earliest due symbol, clamped to [1, max_wait]
+def seconds_until_due(schedule, symbols, now=None, max_wait=MAX_WAIT):
+    now = time.time() if now is None else now
+    dues = [schedule[symbol]['due'] if symbol in schedule else now for symbol in symbols]
+    if not dues:
+        return max_wait
+    return min(max(min(dues) - now, 1), max_wait)
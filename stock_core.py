@@ -0,0 +1,671 @@
+import time
+import logging
+import threading
+from datetime import datetime, time as dt_time, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+import requests
+
+import http_pool
+import indicators
+
+# Data fetching and analysis shared by the dashboards and the headless daemon.
+# Nothing here touches Streamlit: problems are reported through `logger`, which the
+# dashboards forward to st.error/st.warning and the daemon writes to its log.
+# HTTP clients come from http_pool, which imports yfinance and polygon on first use.
+logger = logging.getLogger(__name__)
+
+# Custom RSI calculation
+def calculate_rsi(data, periods=14):
+    return pd.Series(indicators.rsi(data['Close'].to_numpy(), periods), index=data.index)
+
+# Detect breakout patterns
+def detect_breakout(df, lookback=20):
+    if len(df) < lookback:
+        return None, None
+    resistance, support, avg_volume = indicators.breakout_levels(df['High'].to_numpy(), df['Low'].to_numpy(), 
+                                                                df['Volume'].to_numpy(), lookback)
+    current_price = df['Close'].iloc[-1]
+    current_volume = df['Volume'].iloc[-1]
+    
+    if current_price > resistance and current_volume > 1.5 * avg_volume:
+        return 'Bullish', f"Price broke above resistance (${resistance:.2f}) with high volume"
+    elif current_price < support and current_volume > 1.5 * avg_volume:
+        return 'Bearish', f"Price broke below support (${support:.2f}) with high volume"
+    return None, None
+
+# Candlestick patterns in the order they are checked on each candle. Each chain is a priority
+# list (the first matching pattern wins); the second chain is evaluated independently of the
+# first, so a candle can report one pattern from each.
+PATTERN_CHAIN_1 = [
+    ('Bullish Engulfing', 'Bullish'),
+    ('Bearish Engulfing', 'Bearish'),
+    ('Doji', 'Neutral'),
+    ('Hammer', 'Bullish'),
+    ('Shooting Star', 'Bearish'),
+    ('Morning Star', 'Bullish'),
+    ('Evening Star', 'Bearish'),
+    ('Bullish Harami', 'Bullish'),
+    ('Bearish Harami', 'Bearish'),
+    ('Bullish Kicker', 'Bullish'),
+    ('Bearish Kicker', 'Bearish'),
+]
+PATTERN_CHAIN_2 = [
+    ('Three White Soldiers', 'Bullish'),
+    ('Three Black Crows', 'Bearish'),
+    ('Piercing Line', 'Bullish'),
+    ('Dark Cloud Cover', 'Bearish'),
+]
+PATTERN_DETAILS = {
+    'Bullish Engulfing': 'Price may rise after engulfing prior bearish candle',
+    'Bearish Engulfing': 'Price may fall after engulfing prior bullish candle',
+    'Doji': 'Market indecision; watch for breakout',
+    'Hammer': 'Potential reversal upward after downtrend',
+    'Shooting Star': 'Potential reversal downward after uptrend',
+    'Morning Star': 'Strong reversal upward after downtrend',
+    'Evening Star': 'Strong reversal downward after uptrend',
+    'Bullish Harami': 'Potential reversal upward; small bullish candle inside bearish candle',
+    'Bearish Harami': 'Potential reversal downward; small bearish candle inside bullish candle',
+    'Bullish Kicker': 'Strong bullish reversal with gap up after downtrend',
+    'Bearish Kicker': 'Strong bearish reversal with gap down after uptrend',
+    'Three White Soldiers': 'Strong upward momentum with three consecutive bullish candles',
+    'Three Black Crows': 'Strong downward momentum with three consecutive bearish candles',
+    'Piercing Line': 'Bullish reversal; bullish candle pierces bearish candle midpoint',
+    'Dark Cloud Cover': 'Bearish reversal; bearish candle covers bullish candle midpoint',
+}
+
+# Pattern id per bar for both chains (-1 = no pattern)
+def pattern_codes(o, h, l, c):
+    n = len(c)
+    o_p, h_p, l_p, c_p = (np.roll(a, 1) for a in (o, h, l, c))
+    o_p2, h_p2, l_p2, c_p2 = (np.roll(a, 2) for a in (o, h, l, c))
+    rng, rng_p, rng_p2 = h - l, h_p - l_p, h_p2 - l_p2
+    body = np.abs(c - o)
+    bar = np.arange(n)
+
+    bear_p, bull_p = c_p < o_p, c_p > o_p
+    bull_c, bear_c = c > o, c < o
+    chain_1 = [
+        bear_p & bull_c & (c > o_p) & (o < c_p),
+        bull_p & bear_c & (c < o_p) & (o > c_p),
+        body <= rng * 0.1,
+        (rng > 2 * body) & (c - l >= 0.7 * rng) & (o - l >= 0.7 * rng),
+        (rng > 2 * body) & (h - c >= 0.7 * rng) & (h - o >= 0.7 * rng),
+        (c_p2 > o_p2) & bear_p & (np.abs(c_p - o_p) < rng_p * 0.3) & bull_c & (c > (o_p2 + c_p2) / 2),
+        (c_p2 < o_p2) & bull_p & (np.abs(c_p - o_p) < rng_p * 0.3) & bear_c & (c < (o_p2 + c_p2) / 2),
+        bear_p & bull_c & (o >= c_p) & (c <= o_p),
+        bull_p & bear_c & (o <= c_p) & (c >= o_p),
+        bear_p & bull_c & (o > h_p),
+        bull_p & bear_c & (o < l_p),
+    ]
+    chain_2 = [
+        (bar >= 3) & bull_c & bull_p & (c_p2 > o_p2) & (c - o > rng * 0.5) & (c_p - o_p > rng_p * 0.5) & (c_p2 - o_p2 > rng_p2 * 0.5),
+        (bar >= 3) & bear_c & bear_p & (c_p2 < o_p2) & (o - c > rng * 0.5) & (o_p - c_p > rng_p * 0.5) & (o_p2 - c_p2 > rng_p2 * 0.5),
+        bear_p & bull_c & (c > (o_p + c_p) / 2) & (o < c_p),
+        bull_p & bear_c & (c < (o_p + c_p) / 2) & (o > c_p),
+    ]
+
+    codes = []
+    for offset, conditions in ((0, chain_1), (len(PATTERN_CHAIN_1), chain_2)):
+        code = np.full(n, -1, dtype=np.int16)
+        for k, cond in enumerate(conditions):
+            code[(code == -1) & cond] = offset + k
+        code[:2] = -1
+        codes.append(code)
+    return codes
+
+# Bullish/neutral and bearish confidence per bar: 50 points when volume beats 1.5x the prior
+# 20-candle average, plus RSI (or 100 - RSI for bearish patterns) scaled to 50 points
+def pattern_confidence(v, rsi):
+    idx = np.arange(len(v))
+    prior_avg = np.roll(indicators.sma(v, 20, min_periods=1), 1)
+    prior_avg[0] = np.nan
+    volume_score = np.where(v > 1.5 * prior_avg, 50.0, 0.0)
+    rsi = np.where(idx >= 13, rsi, 50.0)
+    return np.round(volume_score + 50 * (rsi / 100), 1), np.round(volume_score + 50 * ((100 - rsi) / 100), 1)
+
+# Every detected pattern as a table, ordered by bar and then by chain
+def pattern_table(df):
+    o, h, l, c, v = (df[col].to_numpy(dtype=np.float64) for col in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    if len(c) < 3:
+        return pd.DataFrame(columns=['Timestamp', 'Pattern', 'Signal', 'Details', 'Confidence'])
+    bullish_conf, bearish_conf = pattern_confidence(v, indicators.rsi(c))
+    codes = pattern_codes(o, h, l, c)
+    bars = np.concatenate([np.flatnonzero(code >= 0) for code in codes])
+    ids = np.concatenate([code[code >= 0] for code in codes]).astype(np.int64)
+    order = np.argsort(bars, kind='stable')
+    bars, ids = bars[order], ids[order]
+    patterns = PATTERN_CHAIN_1 + PATTERN_CHAIN_2
+    names = np.array([name for name, _ in patterns])[ids]
+    signals = np.array([signal for _, signal in patterns])[ids]
+    return pd.DataFrame({
+        'Timestamp': df.index[bars],
+        'Pattern': names,
+        'Signal': signals,
+        'Details': [PATTERN_DETAILS[name] for name in names],
+        'Confidence': np.where(signals == 'Bearish', bearish_conf[bars], bullish_conf[bars]),
+    })
+
+# Detect candlestick patterns
+def detect_candlestick_patterns(df):
+    patterns = pattern_table(df)
+    patterns['Timestamp'] = [ts.strftime('%Y-%m-%d %H:%M:%S %Z') for ts in patterns['Timestamp']]
+    return patterns.to_dict('records')
+
+# Fetch Yahoo Finance data for the current (or previous) trading day
+def get_stock_data(symbol, interval, extended_hours=False):
+    try:
+        supported_intervals = {'1m': '1m', '2m': '2m', '3m': '1m', '5m': '5m', '10m': '1m', 
+                              '15m': '15m', '30m': '30m', '45m': '1m', '1h': '1h', 
+                              '2h': '1h', '3h': '1h', '4h': '1h'}
+        period = '7d' if interval in ['2h', '3h', '4h'] else '1d'
+        fetch_interval = supported_intervals[interval]
+        
+        stock = http_pool.yahoo_ticker(symbol)
+        with http_pool.track('Yahoo Finance'):
+            df = stock.history(period=period, interval=fetch_interval, prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+        if df.empty or len(df) < 2:
+            logger.error(f"No sufficient data for {symbol} with interval {interval}")
+            return None
+        
+        # Resample for non-standard intervals
+        if interval == '3m':
+            df = df.resample('3min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                        'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval == '10m':
+            df = df.resample('10min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                         'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval == '45m':
+            df = df.resample('45min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                         'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval in ['2h', '3h', '4h']:
+            hours = int(interval[0])
+            df = df.resample(f'{hours}H').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                             'Close': 'last', 'Volume': 'sum'}).dropna()
+        
+        # Filter for current trading day or extended hours
+        local_tz = pytz.timezone('America/New_York')
+        df = df.tz_convert(local_tz)
+        today = datetime.now(local_tz).date()
+        if extended_hours:
+            df = df.between_time(dt_time(4, 0), dt_time(20, 0))  # Pre/post-market
+        else:
+            df = df[df.index.date == today]
+        
+        if df.empty or len(df) < 2:
+            # Fallback to previous trading day
+            yesterday = today - timedelta(days=1)
+            with http_pool.track('Yahoo Finance'):
+                df = stock.history(period='2d', interval=fetch_interval, prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+            df = df.tz_convert(local_tz)
+            df = df[df.index.date == yesterday]
+            if extended_hours:
+                df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df = df.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if df.empty or len(df) < 2:
+                logger.warning(f"No data for {symbol} on current or previous trading day with interval {interval}")
+                return None
+        
+        current_price = df['Close'].iloc[-1]
+        previous_price = df['Close'].iloc[-2]
+        current_volume = df['Volume'].iloc[-1]
+        previous_volume = df['Volume'].iloc[-2]
+        timestamp = df.index[-1]
+        timestamp_local = timestamp.strftime('%Y-%m-%d %H:%M:%S %Z')
+        change_pct = round(((current_price - previous_price) / previous_price) * 100, 3)
+        volume_change_pct = round(((current_volume - previous_volume) / previous_volume) * 100, 3) if previous_volume > 0 else 0
+        return {
+            'data': df,
+            'price': current_price,
+            'volume': current_volume,
+            'open': df['Open'].iloc[-1],
+            'high': df['High'].iloc[-1],
+            'low': df['Low'].iloc[-1],
+            'change_pct': change_pct,
+            'volume_change_pct': volume_change_pct,
+            'timestamp': timestamp_local
+        }
+    except Exception as e:
+        logger.error(f"Error fetching data for {symbol}: {str(e)}")
+        return None
+
+# Timestamps of recent Polygon.io calls, used when the caller doesn't track its own.
+# Call lists are only read and changed under _polygon_calls_lock, as hedged fetches run on threads.
+_polygon_api_calls = []
+_polygon_calls_lock = threading.Lock()
+
+# Check Polygon.io API rate limit
+def check_polygon_rate_limit(api_calls=None):
+    if api_calls is None:
+        api_calls = _polygon_api_calls
+    now = time.time()
+    with _polygon_calls_lock:
+        # Remove calls older than 60 seconds
+        api_calls[:] = [t for t in api_calls if now - t < 60]
+        return len(api_calls) < 5
+
+# Count Polygon.io calls made at `timestamps` (default: one call now)
+def record_polygon_calls(api_calls, *timestamps):
+    with _polygon_calls_lock:
+        api_calls.extend(timestamps or (time.time(),))
+
+# Fetch data from Polygon.io. `cancelled` (a threading.Event) stops a fetch that is no longer
+# wanted before it spends another call on a retry or fallback request.
+def get_polygon_data(symbol, interval, api_key, extended_hours=False, api_calls=None, cancelled=None):
+    if api_calls is None:
+        api_calls = _polygon_api_calls
+    try:
+        supported_intervals = {'1m': '1m', '2m': '2m', '3m': '1m', '5m': '5m', '10m': '1m', 
+                              '15m': '15m', '30m': '30m', '45m': '1m', '1h': '1h', 
+                              '2h': '1h', '3h': '1h', '4h': '1h'}
+        fetch_interval = supported_intervals[interval]
+        period = '7d' if interval in ['2h', '3h', '4h'] else '1d'
+        
+        if not check_polygon_rate_limit(api_calls):
+            logger.error(f"Polygon.io rate limit exceeded (5 calls/minute). Please wait or switch to Yahoo Finance.")
+            return None
+        
+        client = http_pool.polygon_client(api_key)
+        local_tz = pytz.timezone('America/New_York')
+        today = datetime.now(local_tz).date()
+        yesterday = today - timedelta(days=1)
+        from_date = today.strftime('%Y-%m-%d') if period == '1d' else (today - timedelta(days=7)).strftime('%Y-%m-%d')
+        to_date = today.strftime('%Y-%m-%d')
+        
+        # Fetch aggregates
+        aggs = []
+        with http_pool.track('Polygon.io', api_key):
+            for a in client.list_aggs(ticker=symbol, multiplier=1, timespan='minute', 
+                                    from_=from_date, to=to_date, limit=50000):
+                aggs.append({
+                    'timestamp': pd.to_datetime(a.timestamp, unit='ms').tz_localize('UTC').tz_convert(local_tz),
+                    'Open': a.open,
+                    'High': a.high,
+                    'Low': a.low,
+                    'Close': a.close,
+                    'Volume': a.volume
+                })
+        record_polygon_calls(api_calls)
+        
+        if not aggs:
+            logger.error(f"No data returned for {symbol} from Polygon.io")
+            return None
+        
+        df = pd.DataFrame(aggs)
+        df.set_index('timestamp', inplace=True)
+        
+        # Filter for current trading day or extended hours
+        if extended_hours:
+            df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+        else:
+            df = df[df.index.date == today].between_time(dt_time(9, 30), dt_time(16, 0))
+        
+        # Validate last candle
+        if not df.empty and len(df) >= 2:
+            last_candle = df.iloc[-1]
+            if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+                if cancelled is not None and cancelled.is_set():
+                    return None
+                logger.warning(f"Last Polygon.io candle for {symbol} has identical OHLC values (${last_candle['Open']:.2f}), possibly incomplete. Trying to fetch more data...")
+                # Retry with broader range
+                aggs = []
+                with http_pool.track('Polygon.io', api_key):
+                    for a in client.list_aggs(ticker=symbol, multiplier=1, timespan='minute', 
+                                            from_=(today - timedelta(days=1)).strftime('%Y-%m-%d'), 
+                                            to=to_date, limit=50000):
+                        aggs.append({
+                            'timestamp': pd.to_datetime(a.timestamp, unit='ms').tz_localize('UTC').tz_convert(local_tz),
+                            'Open': a.open,
+                            'High': a.high,
+                            'Low': a.low,
+                            'Close': a.close,
+                            'Volume': a.volume
+                        })
+                record_polygon_calls(api_calls)
+                df = pd.DataFrame(aggs)
+                df.set_index('timestamp', inplace=True)
+                if extended_hours:
+                    df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+                else:
+                    df = df[df.index.date == today].between_time(dt_time(9, 30), dt_time(16, 0))
+        
+        # Fallback to previous trading day
+        if df.empty or len(df) < 2:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            df = pd.DataFrame([])
+            aggs = []
+            with http_pool.track('Polygon.io', api_key):
+                for a in client.list_aggs(ticker=symbol, multiplier=1, timespan='minute', 
+                                        from_=yesterday.strftime('%Y-%m-%d'), 
+                                        to=yesterday.strftime('%Y-%m-%d'), limit=50000):
+                    aggs.append({
+                        'timestamp': pd.to_datetime(a.timestamp, unit='ms').tz_localize('UTC').tz_convert(local_tz),
+                        'Open': a.open,
+                        'High': a.high,
+                        'Low': a.low,
+                        'Close': a.close,
+                        'Volume': a.volume
+                    })
+            record_polygon_calls(api_calls)
+            df = pd.DataFrame(aggs)
+            df.set_index('timestamp', inplace=True)
+            if extended_hours:
+                df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df = df.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if df.empty or len(df) < 2:
+                logger.warning(f"No valid Polygon.io data for {symbol} on current or previous trading day with interval {interval}")
+                return None
+        
+        # Final validation
+        last_candle = df.iloc[-1]
+        if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+            logger.warning(f"Last Polygon.io candle for {symbol} still has identical OHLC values (${last_candle['Open']:.2f}) after retry. Data may be stale or from low-liquidity period.")
+        
+        current_price = df['Close'].iloc[-1]
+        previous_price = df['Close'].iloc[-2]
+        current_volume = df['Volume'].iloc[-1]
+        previous_volume = df['Volume'].iloc[-2]
+        timestamp = df.index[-1]
+        timestamp_local = timestamp.strftime('%Y-%m-%d %H:%M:%S %Z')
+        change_pct = round(((current_price - previous_price) / previous_price) * 100, 3)
+        volume_change_pct = round(((current_volume - previous_volume) / previous_volume) * 100, 3) if previous_volume > 0 else 0
+        
+        # Debug output
+        logger.info(f"Last Polygon.io candle for {symbol} at {timestamp_local}: Open=${last_candle['Open']:.2f}, High=${last_candle['High']:.2f}, Low=${last_candle['Low']:.2f}, Close=${last_candle['Close']:.2f}, Volume={int(last_candle['Volume']):,}")
+        
+        return {
+            'data': df,
+            'price': current_price,
+            'volume': current_volume,
+            'open': df['Open'].iloc[-1],
+            'high': df['High'].iloc[-1],
+            'low': df['Low'].iloc[-1],
+            'change_pct': change_pct,
+            'volume_change_pct': volume_change_pct,
+            'timestamp': timestamp_local
+        }
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 429:
+            logger.error(f"Polygon.io rate limit exceeded (5 calls/minute) for {symbol}. Please wait or switch to Yahoo Finance.")
+        else:
+            logger.error(f"Error fetching Polygon.io data for {symbol}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching Polygon.io data for {symbol}: {str(e)}")
+        return None
+
+# Fetch data from Yahoo Finance
+def get_yahoo_data(symbol, interval, extended_hours=False):
+    try:
+        supported_intervals = {'1m': '1m', '2m': '2m', '3m': '1m', '5m': '5m', '10m': '1m', 
+                              '15m': '15m', '30m': '30m', '45m': '1m', '1h': '1h', 
+                              '2h': '1h', '3h': '1h', '4h': '1h'}
+        period = '7d' if interval in ['2h', '3h', '4h'] else '1d'
+        fetch_interval = supported_intervals[interval]
+        
+        stock = http_pool.yahoo_ticker(symbol)
+        with http_pool.track('Yahoo Finance'):
+            df = stock.history(period=period, interval=fetch_interval, prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+        if df.empty or len(df) < 2:
+            logger.error(f"No sufficient data for {symbol} with interval {interval} from Yahoo Finance")
+            return None
+        
+        # Resample for non-standard intervals
+        if interval == '3m':
+            df = df.resample('3min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                        'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval == '10m':
+            df = df.resample('10min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                         'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval == '45m':
+            df = df.resample('45min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                         'Close': 'last', 'Volume': 'sum'}).dropna()
+        elif interval in ['2h', '3h', '4h']:
+            hours = int(interval[0])
+            df = df.resample(f'{hours}H').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 
+                                             'Close': 'last', 'Volume': 'sum'}).dropna()
+        
+        # Filter for current trading day or extended hours
+        local_tz = pytz.timezone('America/New_York')
+        df = df.tz_convert(local_tz)
+        today = datetime.now(local_tz).date()
+        if extended_hours:
+            df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+        else:
+            df = df[df.index.date == today].between_time(dt_time(9, 30), dt_time(16, 0))
+        
+        # Validate last candle
+        if not df.empty and len(df) >= 2:
+            last_candle = df.iloc[-1]
+            if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+                logger.warning(f"Last Yahoo Finance candle for {symbol} has identical OHLC values (${last_candle['Open']:.2f}), possibly incomplete. Trying to fetch more data...")
+                with http_pool.track('Yahoo Finance'):
+                    df = stock.history(period='1d', interval=fetch_interval, prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+                df = df.tz_convert(local_tz)
+                if extended_hours:
+                    df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+                else:
+                    df = df[df.index.date == today].between_time(dt_time(9, 30), dt_time(16, 0))
+        
+        # Fallback to previous trading day
+        if df.empty or len(df) < 2:
+            yesterday = today - timedelta(days=1)
+            with http_pool.track('Yahoo Finance'):
+                df = stock.history(period='2d', interval=fetch_interval, prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+            df = df.tz_convert(local_tz)
+            df = df[df.index.date == yesterday]
+            if extended_hours:
+                df = df.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df = df.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if df.empty or len(df) < 2:
+                logger.warning(f"No valid Yahoo Finance data for {symbol} on current or previous trading day with interval {interval}")
+                return None
+        
+        # Final validation
+        last_candle = df.iloc[-1]
+        if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+            logger.warning(f"Last Yahoo Finance candle for {symbol} still has identical OHLC values (${last_candle['Open']:.2f}) after retry. Data may be stale or from low-liquidity period.")
+        
+        current_price = df['Close'].iloc[-1]
+        previous_price = df['Close'].iloc[-2]
+        current_volume = df['Volume'].iloc[-1]
+        previous_volume = df['Volume'].iloc[-2]
+        timestamp = df.index[-1]
+        timestamp_local = timestamp.strftime('%Y-%m-%d %H:%M:%S %Z')
+        change_pct = round(((current_price - previous_price) / previous_price) * 100, 3)
+        volume_change_pct = round(((current_volume - previous_volume) / previous_volume) * 100, 3) if previous_volume > 0 else 0
+        
+        # Debug output
+        logger.info(f"Last Yahoo Finance candle for {symbol} at {timestamp_local}: Open=${last_candle['Open']:.2f}, High=${last_candle['High']:.2f}, Low=${last_candle['Low']:.2f}, Close=${last_candle['Close']:.2f}, Volume={int(last_candle['Volume']):,}")
+        
+        return {
+            'data': df,
+            'price': current_price,
+            'volume': current_volume,
+            'open': df['Open'].iloc[-1],
+            'high': df['High'].iloc[-1],
+            'low': df['Low'].iloc[-1],
+            'change_pct': change_pct,
+            'volume_change_pct': volume_change_pct,
+            'timestamp': timestamp_local
+        }
+    except Exception as e:
+        logger.error(f"Error fetching Yahoo Finance data for {symbol}: {str(e)}")
+        return None
+
+# Volume trend data
+def get_volume_trend_data(symbol, extended_hours=False, data_source='Yahoo Finance', api_key=None, api_calls=None):
+    if api_calls is None:
+        api_calls = _polygon_api_calls
+    try:
+        local_tz = pytz.timezone('America/New_York')
+        today = datetime.now(local_tz).date()
+        yesterday = today - timedelta(days=1)
+        
+        if data_source == 'Polygon.io':
+            if not api_key:
+                logger.error("A Polygon.io API key is required for Polygon.io volume trend data")
+                return None
+            if not check_polygon_rate_limit(api_calls):
+                logger.error(f"Polygon.io rate limit exceeded (5 calls/minute). Please wait or switch to Yahoo Finance.")
+                return None
+            
+            client = http_pool.polygon_client(api_key)
+            aggs = []
+            with http_pool.track('Polygon.io', api_key):
+                for a in client.list_aggs(ticker=symbol, multiplier=1, timespan='minute', 
+                                        from_=yesterday.strftime('%Y-%m-%d'), to=today.strftime('%Y-%m-%d'), limit=50000):
+                    aggs.append({
+                        'timestamp': pd.to_datetime(a.timestamp, unit='ms').tz_localize('UTC').tz_convert(local_tz),
+                        'Open': a.open,
+                        'High': a.high,
+                        'Low': a.low,
+                        'Close': a.close,
+                        'Volume': a.volume
+                    })
+            record_polygon_calls(api_calls)
+            
+            df = pd.DataFrame(aggs)
+            df.set_index('timestamp', inplace=True)
+            
+            # Try current day first
+            df_today = df[df.index.date == today]
+            if extended_hours:
+                df_today = df_today.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df_today = df_today.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if not df_today.empty and len(df_today) >= 2:
+                last_candle = df_today.iloc[-1]
+                if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+                    logger.warning(f"Last Polygon.io volume trend candle for {symbol} has identical OHLC values (${last_candle['Open']:.2f}). Data may be incomplete.")
+                return df_today
+            
+            # Fallback to previous trading day
+            df_yesterday = df[df.index.date == yesterday]
+            if extended_hours:
+                df_yesterday = df_yesterday.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df_yesterday = df_yesterday.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if df_yesterday.empty or len(df_yesterday) < 2:
+                logger.warning(f"No Polygon.io data for {symbol} on current or previous trading day")
+                return None
+            return df_yesterday
+        else:
+            stock = http_pool.yahoo_ticker(symbol)
+            with http_pool.track('Yahoo Finance'):
+                df = stock.history(period='2d', interval='1m', prepost=extended_hours, timeout=http_pool.SETTINGS['read_timeout'])
+            if df.empty or len(df) < 2:
+                logger.error(f"No intraday Yahoo Finance data for {symbol}")
+                return None
+            df = df.tz_convert(local_tz)
+            
+            # Try current day first
+            df_today = df[df.index.date == today]
+            if extended_hours:
+                df_today = df_today.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df_today = df_today.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if not df_today.empty and len(df_today) >= 2:
+                last_candle = df_today.iloc[-1]
+                if last_candle['Open'] == last_candle['High'] == last_candle['Low'] == last_candle['Close']:
+                    logger.warning(f"Last Yahoo Finance volume trend candle for {symbol} has identical OHLC values (${last_candle['Open']:.2f}). Data may be incomplete.")
+                return df_today
+            
+            # Fallback to previous trading day
+            df_yesterday = df[df.index.date == yesterday]
+            if extended_hours:
+                df_yesterday = df_yesterday.between_time(dt_time(4, 0), dt_time(20, 0))
+            else:
+                df_yesterday = df_yesterday.between_time(dt_time(9, 30), dt_time(16, 0))
+            
+            if df_yesterday.empty or len(df_yesterday) < 2:
+                logger.warning(f"No Yahoo Finance data for {symbol} on current or previous trading day")
+                return None
+            return df_yesterday
+    except requests.exceptions.HTTPError as e:
+        if data_source == 'Polygon.io' and e.response.status_code == 429:
+            logger.error(f"Polygon.io rate limit exceeded (5 calls/minute). Please wait or switch to Yahoo Finance.")
+        else:
+            logger.error(f"Error fetching intraday data for {symbol}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching intraday data for {symbol}: {str(e)}")
+        return None
+
+
+# Generate recommendations
+def generate_recommendations(symbol, df_volume, change_pct, df_candlestick):
+    recommendations = []
+    
+    # Breakout detection
+    breakout_signal, breakout_details = detect_breakout(df_candlestick)
+    if breakout_signal:
+        recommendations.append(f"{breakout_signal} breakout detected: {breakout_details}")
+    
+    # Volume spikes
+    if df_volume is not None and not df_volume.empty:
+        volume_data = df_volume['Volume']
+        volume_changes = volume_data.pct_change() * 100
+        spike_threshold = 50
+        spikes = volume_changes[volume_changes > spike_threshold]
+        if not spikes.empty:
+            spike_times = spikes.index.strftime('%H:%M')
+            recommendations.append(f"High volume spikes detected at {', '.join(spike_times)} EDT, indicating strong buying/selling pressure.")
+    
+    # Price momentum
+    if isinstance(change_pct, (int, float, np.floating)) and not np.isnan(change_pct):
+        if change_pct > 2:
+            recommendations.append(f"{symbol} (+{change_pct:.3f}%) shows bullish momentum; consider holding or buying on dips.")
+        elif change_pct < -2:
+            recommendations.append(f"{symbol} ({change_pct:+.3f}%) shows bearish momentum; consider selling or waiting for a reversal.")
+        else:
+            recommendations.append(f"{symbol} ({change_pct:+.3f}%) is stable; monitor for breakout patterns or candlestick signals.")
+    
+    # Candlestick patterns
+    patterns = detect_candlestick_patterns(df_candlestick)
+    for pattern in patterns[-3:]:  # Show last 3 patterns
+        recommendations.append(f"{pattern['Signal']} pattern detected at {pattern['Timestamp']}: {pattern['Pattern']} ({pattern['Details']}, Confidence: {pattern['Confidence']:.1f})")
+    
+    # SMA
+    if df_candlestick is not None and len(df_candlestick) >= 50:
+        sma = indicators.sma(df_candlestick['Close'].to_numpy(), 50)[-1]
+        current_price = df_candlestick['Close'].iloc[-1]
+        if current_price > sma:
+            recommendations.append("Price is above 50-period SMA; bullish trend indicated.")
+        elif current_price < sma:
+            recommendations.append("Price is below 50-period SMA; bearish trend indicated.")
+    
+    # RSI
+    if df_candlestick is not None and len(df_candlestick) >= 14:
+        rsi = calculate_rsi(df_candlestick).iloc[-1]
+        if rsi > 70:
+            recommendations.append("RSI above 70; stock may be overbought, consider taking profits.")
+        elif rsi < 30:
+            recommendations.append("RSI below 30; stock may be oversold, potential buying opportunity.")
+    
+    recommendations.append("Note: These are not financial advice; consult a professional.")
+    return recommendations if recommendations else ["No specific recommendations; monitor market conditions. Note: These are not financial advice; consult a professional."]
+
+# Generate alerts
+def generate_alerts(symbol, change_pct, volume_change_pct, df_candlestick):
+    alerts = []
+    if isinstance(change_pct, (int, float, np.floating)) and not np.isnan(change_pct) and abs(change_pct) > 5:
+        alerts.append(f"Significant price movement in {symbol}: {change_pct:+.3f}%")
+    if isinstance(volume_change_pct, (int, float, np.floating)) and not np.isnan(volume_change_pct) and volume_change_pct > 100:
+        alerts.append(f"Significant volume spike in {symbol}: +{volume_change_pct:.3f}%")
+    breakout_signal, breakout_details = detect_breakout(df_candlestick)
+    if breakout_signal:
+        alerts.append(f"{breakout_signal} breakout detected for {symbol}: {breakout_details}")
+    return alerts
@@ -0,0 +1,22 @@
+import logging
+
+import streamlit as st
+
+# Show messages from the shared fetch/analysis code in the page
+class StreamlitLogHandler(logging.Handler):
+    def emit(self, record):
+        message = self.format(record)
+        if record.levelno >= logging.ERROR:
+            st.error(message)
+        elif record.levelno >= logging.WARNING:
+            st.warning(message)
+        else:
+            st.write(f"Debug: {message}")
+
+# Attach the handler once per process; Streamlit reruns the page script on every interaction
+def install(logger):
+    if not any(handler.get_name() == 'streamlit' for handler in logger.handlers):
+        handler = StreamlitLogHandler()
+        handler.set_name('streamlit')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The dashboard modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Random-walk OHLCV bars in New York time
+def make_bars(n=300, freq='1min', start='2025-01-02 09:30', seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.8, n)
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + rng.exponential(0.5, n),
+        'Low': np.minimum(open_, close) - rng.exponential(0.5, n),
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(np.float64),
+    }, index=pd.date_range(start, periods=n, freq=freq, tz='America/New_York'))
+
+@pytest.fixture
+def bars():
+    return make_bars
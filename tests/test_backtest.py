@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import indicators
+import stock_core
+
+# Candle-by-candle reference for the pattern rules, written the way the dashboards' original
+# detect_candlestick_patterns loop checked them
+def reference_patterns(df):
+    o, h, l, c, v = (df[col].to_numpy() for col in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    rsi_values = indicators.rsi(c)
+    avg_volumes = pd.Series(v).rolling(20, min_periods=1).mean().to_numpy()
+    found = []
+    for i in range(2, len(df)):
+        oc, cc, hc, lc = o[i], c[i], h[i], l[i]
+        op, cp, hp, lp = o[i - 1], c[i - 1], h[i - 1], l[i - 1]
+        op2, cp2, hp2, lp2 = o[i - 2], c[i - 2], h[i - 2], l[i - 2]
+        volume_score = 50 if v[i] > 1.5 * avg_volumes[i - 1] else 0
+        rsi = rsi_values[i] if i >= 13 else 50
+        chain_1 = [
+            ('Bullish Engulfing', cp < op and cc > oc and cc > op and oc < cp),
+            ('Bearish Engulfing', cp > op and cc < oc and cc < op and oc > cp),
+            ('Doji', abs(cc - oc) <= (hc - lc) * 0.1),
+            ('Hammer', (hc - lc) > 2 * abs(cc - oc) and (cc - lc) >= 0.7 * (hc - lc) and (oc - lc) >= 0.7 * (hc - lc)),
+            ('Shooting Star', (hc - lc) > 2 * abs(cc - oc) and (hc - cc) >= 0.7 * (hc - lc) and (hc - oc) >= 0.7 * (hc - lc)),
+            ('Morning Star', cp2 > op2 and cp < op and abs(cp - op) < (hp - lp) * 0.3 and cc > oc and cc > (op2 + cp2) / 2),
+            ('Evening Star', cp2 < op2 and cp > op and abs(cp - op) < (hp - lp) * 0.3 and cc < oc and cc < (op2 + cp2) / 2),
+            ('Bullish Harami', cp < op and cc > oc and oc >= cp and cc <= op),
+            ('Bearish Harami', cp > op and cc < oc and oc <= cp and cc >= op),
+            ('Bullish Kicker', cp < op and cc > oc and oc > hp),
+            ('Bearish Kicker', cp > op and cc < oc and oc < lp),
+        ]
+        chain_2 = [
+            ('Three White Soldiers', i >= 3 and cc > oc and cp > op and cp2 > op2 and (cc - oc) > (hc - lc) * 0.5
+             and (cp - op) > (hp - lp) * 0.5 and (cp2 - op2) > (hp2 - lp2) * 0.5),
+            ('Three Black Crows', i >= 3 and cc < oc and cp < op and cp2 < op2 and (oc - cc) > (hc - lc) * 0.5
+             and (op - cp) > (hp - lp) * 0.5 and (op2 - cp2) > (hp2 - lp2) * 0.5),
+            ('Piercing Line', cp < op and cc > oc and cc > (op + cp) / 2 and oc < cp),
+            ('Dark Cloud Cover', cp > op and cc < oc and cc < (op + cp) / 2 and oc > cp),
+        ]
+        signals = dict(stock_core.PATTERN_CHAIN_1 + stock_core.PATTERN_CHAIN_2)
+        for chain in (chain_1, chain_2):
+            name = next((name for name, matched in chain if matched), None)
+            if name is not None:
+                rsi_score = 50 * ((100 - rsi) / 100) if signals[name] == 'Bearish' else 50 * (rsi / 100)
+                found.append((df.index[i], name, round(volume_score + rsi_score, 1)))
+    return found
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pattern_table_matches_candle_loop(bars, seed):
+    df = bars(400, seed=seed)
+    table = stock_core.pattern_table(df)
+    assert list(zip(table['Timestamp'], table['Pattern'])) == [(ts, name) for ts, name, _ in reference_patterns(df)]
+    np.testing.assert_allclose(table['Confidence'], [conf for _, _, conf in reference_patterns(df)])
+
+def test_pattern_table_short_frame(bars):
+    assert stock_core.pattern_table(bars(2)).empty
+    assert stock_core.detect_candlestick_patterns(bars(2)) == []
+
+def test_forward_returns_stay_in_session():
+    c = np.array([1.0, 2.0, 4.0, 8.0])
+    days = np.array([0, 0, 1, 1])
+    fwd = backtest.forward_returns(c, (1, 2), days)
+    np.testing.assert_allclose(fwd[1], [1.0, np.nan, 1.0, np.nan])
+    np.testing.assert_allclose(fwd[2], [np.nan, np.nan, np.nan, np.nan])
+    np.testing.assert_allclose(backtest.forward_returns(c, (2,))[2], [3.0, 3.0, np.nan, np.nan])
+
+def test_evaluate_frame_counts_every_pattern(bars):
+    df = bars(400, seed=3)
+    stats = backtest.evaluate_frame(df, horizons=(1, 5))
+    counts = stats.groupby('Signal')['count'].sum()
+    expected = stock_core.pattern_table(df)['Pattern'].value_counts()
+    assert counts[expected.index].to_dict() == expected.to_dict()
+    assert (stats['n_5'] <= stats['count']).all()
+
+def test_run_backtest_over_files(bars, tmp_path):
+    for seed, symbol in enumerate(('AAA', 'BBB')):
+        bars(300, seed=seed).to_parquet(tmp_path / f"{symbol}.parquet")
+    summary, calibration = backtest.run_backtest(str(tmp_path), horizons=(1, 5), workers=1)
+    per_file = [backtest.evaluate_frame(backtest.load_bars(str(tmp_path / f"{symbol}.parquet")), (1, 5))
+                for symbol in ('AAA', 'BBB')]
+    assert summary['Count'].sum() == sum(stats['count'].sum() for stats in per_file)
+    assert set(calibration.index.get_level_values('Signal')) <= {name for name, _ in stock_core.PATTERN_CHAIN_1 + stock_core.PATTERN_CHAIN_2}
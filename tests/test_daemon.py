@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import daemon
+import stock_core
+
+# 14:00 New York time on a Thursday, while the regular session is open
+TRADING_NOW = pd.Timestamp('2025-01-02 14:00', tz='America/New_York').timestamp()
+
+@pytest.fixture
+def config(tmp_path):
+    return {**daemon.DEFAULT_CONFIG, 'symbols': {'AAA': '1m'}, 'output_dir': str(tmp_path), 'fetch_workers': 1}
+
+def stock_info(df):
+    return {'data': df, 'price': df['Close'].iloc[-1], 'change_pct': 0.5, 'volume_change_pct': 10.0,
+            'timestamp': df.index[-1].strftime('%Y-%m-%d %H:%M:%S %Z')}
+
+def test_load_config_normalizes_symbols(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'symbols': ['aapl', 'msft'], 'interval': '15m', 'data_source': 'Polygon.io'}))
+    monkeypatch.setenv('POLYGON_API_KEY', 'secret')
+    config = daemon.load_config(str(path))
+    assert config['symbols'] == {'AAPL': '15m', 'MSFT': '15m'}
+    assert config['polygon_api_key'] == 'secret'
+    assert config['refresh_interval'] == daemon.DEFAULT_CONFIG['refresh_interval']
+
+def test_load_config_requires_symbols(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'symbols': []}))
+    with pytest.raises(ValueError):
+        daemon.load_config(str(path))
+
+def test_write_bars_skips_forming_bar_and_duplicates(config, bars):
+    df = bars(300, start='2025-01-02 09:30')
+    now = df.index[-1].timestamp() + 30
+    monitor = daemon.Monitor(config)
+    assert monitor.write_bars('AAA', df, '1m', now=now) == len(df) - 1
+    # Once the forming bar has closed it is appended, and nothing is written twice
+    assert monitor.write_bars('AAA', df, '1m', now=now + 60) == 1
+    assert monitor.write_bars('AAA', df, '1m', now=now + 60) == 0
+    # A restarted monitor picks up from the file on disk
+    assert daemon.Monitor(config).write_bars('AAA', df, '1m', now=now + 60) == 0
+    written = pd.read_csv(monitor._bars_path('AAA'), index_col=0)
+    assert len(written) == len(df)
+
+def test_write_alerts_once_per_bar(config, bars):
+    monitor = daemon.Monitor(config)
+    monitor.core = SimpleNamespace(generate_alerts=lambda *args: ['Significant volume spike'])
+    info = stock_info(bars(30))
+    assert monitor.write_alerts('AAA', info) == 1
+    assert monitor.write_alerts('AAA', info) == 0
+    assert monitor.write_alerts('AAA', stock_info(bars(31))) == 1
+    with open(monitor.alerts_path) as f:
+        assert [json.loads(line)['symbol'] for line in f] == ['AAA', 'AAA']
+
+def test_run_cycle_fetches_due_symbols_and_schedules(config, bars, monkeypatch):
+    df = bars(270, start='2025-01-02 09:30')
+    monkeypatch.setattr(daemon.time, 'time', lambda: TRADING_NOW)
+    fetched = []
+    def get_stock_data(symbol, interval, extended_hours=False):
+        fetched.append(symbol)
+        return stock_info(df) if symbol == 'AAA' else None
+    monitor = daemon.Monitor({**config, 'symbols': {'AAA': '1m', 'BBB': '5m'}})
+    monitor.core = SimpleNamespace(get_stock_data=get_stock_data, generate_alerts=stock_core.generate_alerts)
+    monitor.run_cycle()
+    assert sorted(fetched) == ['AAA', 'BBB']
+    assert monitor.schedule['AAA']['due'] > TRADING_NOW
+    assert monitor.schedule['BBB']['due'] == TRADING_NOW + config['refresh_interval']
+    # Nothing is due again until the next candle
+    monitor.run_cycle()
+    assert sorted(fetched) == ['AAA', 'BBB']
@@ -0,0 +1,57 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import export
+import stock_core
+
+def read_export(data, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == 'arrow':
+        return pa.ipc.open_file(pa.BufferReader(data)).read_pandas()
+    return pd.read_csv(io.BytesIO(gzip.decompress(data)))
+
+@pytest.fixture
+def frames(bars):
+    return {'AAA': bars(120, seed=1), 'BBB': bars(80, seed=2)}
+
+@pytest.mark.parametrize('fmt', list(export.EXPORT_FORMATS))
+def test_bars_round_trip(frames, fmt):
+    result = read_export(b''.join(export.iter_export(frames, 'bars', fmt)), fmt)
+    assert list(result.columns) == export.EXPORT_COLUMNS['bars']
+    expected = pd.concat([export.bars_frame(symbol, df) for symbol, df in frames.items()], ignore_index=True)
+    for col in ('Open', 'High', 'Low', 'Close', 'Volume', 'RSI (14)', 'SMA (50)'):
+        np.testing.assert_allclose(result[col], expected[col], equal_nan=True)
+    assert list(result['Symbol']) == list(expected['Symbol'])
+    timestamps = pd.to_datetime(result['Timestamp'], utc=True)
+    assert list(timestamps) == list(expected['Timestamp'])
+
+@pytest.mark.parametrize('fmt', list(export.EXPORT_FORMATS))
+def test_patterns_match_dashboard_table(frames, fmt):
+    result = read_export(b''.join(export.iter_export(frames, 'patterns', fmt)), fmt)
+    assert list(result.columns) == export.EXPORT_COLUMNS['patterns']
+    shown = pd.DataFrame(stock_core.detect_candlestick_patterns(frames['AAA']))
+    exported = result[result['Symbol'] == 'AAA'].reset_index(drop=True)
+    for col in ('Pattern', 'Signal', 'Details'):
+        assert list(exported[col]) == list(shown[col])
+    np.testing.assert_allclose(exported['Confidence'], shown['Confidence'])
+
+@pytest.mark.parametrize('kind', export.EXPORT_KINDS)
+@pytest.mark.parametrize('fmt', list(export.EXPORT_FORMATS))
+def test_empty_export_keeps_columns(kind, fmt):
+    result = read_export(b''.join(export.iter_export({'AAA': None}, kind, fmt)), fmt)
+    assert result.empty
+    assert list(result.columns) == export.EXPORT_COLUMNS[kind]
+
+def test_export_file_is_rewound(frames):
+    f = export.export_file(frames, 'bars', 'csv.gz')
+    assert len(read_export(f.read(), 'csv.gz')) == sum(len(df) for df in frames.values())
+
+def test_rejects_unknown_format(frames):
+    with pytest.raises(ValueError):
+        list(export.iter_export(frames, 'bars', 'xlsx'))
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import failover
+import stock_core
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(failover, '_health', {source: {'latency': None, 'error_rate': 0.0, 'staleness': None,
+                                                       'requests': 0, 'wins': 0, 'hedges': 0, 'in_flight': []}
+                                              for source in failover.SOURCES})
+
+# Stub providers: `delay` seconds of latency, then the frame (or None to fail)
+@pytest.fixture
+def providers(monkeypatch, bars):
+    frame = bars(30)
+    behaviour = {'Yahoo Finance': (0.0, frame), 'Polygon.io': (0.0, frame)}
+    calls = {'Yahoo Finance': 0, 'Polygon.io': 0}
+
+    def get_yahoo_data(symbol, interval, extended_hours=False):
+        calls['Yahoo Finance'] += 1
+        delay, df = behaviour['Yahoo Finance']
+        time.sleep(delay)
+        if df is None:
+            stock_core.logger.error(f"Yahoo Finance failed for {symbol}")
+            return None
+        return {'data': df}
+
+    def get_polygon_data(symbol, interval, api_key, extended_hours=False, api_calls=None, cancelled=None):
+        calls['Polygon.io'] += 1
+        delay, df = behaviour['Polygon.io']
+        time.sleep(delay)
+        stock_core.record_polygon_calls(api_calls)
+        if cancelled is not None and cancelled.is_set():
+            return None
+        # A retry request, skipped once the fetch has been cancelled
+        stock_core.record_polygon_calls(api_calls)
+        return {'data': df} if df is not None else None
+
+    monkeypatch.setattr(stock_core, 'get_yahoo_data', get_yahoo_data)
+    monkeypatch.setattr(stock_core, 'get_polygon_data', get_polygon_data)
+    return behaviour, calls
+
+def wait_idle():
+    deadline = time.monotonic() + 5
+    while any(health['in_flight'] for health in failover._health.values()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_rank_sources_by_health():
+    assert failover.rank_sources() == ['Yahoo Finance']
+    assert failover.rank_sources('key') == ['Yahoo Finance', 'Polygon.io']
+    failover._health['Yahoo Finance']['latency'] = 0.5
+    failover._health['Polygon.io']['latency'] = 0.2
+    assert failover.primary_source('key') == 'Polygon.io'
+    # Errors and stale data both count against a source
+    failover._health['Polygon.io']['error_rate'] = 0.5
+    assert failover.primary_source('key') == 'Yahoo Finance'
+    failover._health['Polygon.io']['error_rate'] = 0.0
+    failover._health['Polygon.io']['staleness'] = 900
+    assert failover.primary_source('key') == 'Yahoo Finance'
+
+def test_normalize_frame_bins_hourly_bars_on_the_half_hour(bars):
+    df = bars(390).tz_convert('UTC')
+    hourly = failover.normalize_frame(df, '1h')
+    assert hourly.index[0].strftime('%H:%M') == '09:30'
+    assert len(hourly) == 7
+    np.testing.assert_allclose(hourly['Volume'].sum(), df['Volume'].sum())
+    assert hourly['Close'].iloc[0] == df['Close'].iloc[59]
+
+def test_fast_primary_wins_without_hedging(providers):
+    behaviour, calls = providers
+    result = failover.get_data('AAA', '1m', api_key='key', api_calls=[])
+    assert result['source'] == 'Yahoo Finance'
+    assert calls == {'Yahoo Finance': 1, 'Polygon.io': 0}
+    assert failover._health['Yahoo Finance']['wins'] == 1
+
+def test_slow_primary_is_hedged(providers):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.5, behaviour['Yahoo Finance'][1])
+    api_calls = []
+    result = failover.get_data('AAA', '1m', api_key='key', api_calls=api_calls, latency_budget=0.05)
+    assert result['source'] == 'Polygon.io'
+    assert failover._health['Polygon.io']['hedges'] == 1
+    # The winner's request and retry are merged into the caller's call list
+    assert len(api_calls) == 2
+    wait_idle()
+    # The slow loser still finished and updated its health stats
+    assert failover._health['Yahoo Finance']['requests'] == 1
+
+def test_failed_primary_falls_over_quietly(providers, caplog):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.0, None)
+    with caplog.at_level(logging.ERROR, logger=stock_core.logger.name):
+        result = failover.get_data('AAA', '1m', api_key='key', api_calls=[])
+    assert result['source'] == 'Polygon.io'
+    assert 'Yahoo Finance failed' not in caplog.text
+    assert failover._health['Yahoo Finance']['error_rate'] > 0
+
+def test_every_source_failing_reports_errors(providers, caplog):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.0, None)
+    behaviour['Polygon.io'] = (0.0, None)
+    with caplog.at_level(logging.ERROR, logger=stock_core.logger.name):
+        assert failover.get_data('AAA', '1m', api_key='key', api_calls=[]) is None
+    assert 'Yahoo Finance failed' in caplog.text
+
+def test_polygon_loser_is_stopped_and_charged(providers):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.2, behaviour['Yahoo Finance'][1])
+    behaviour['Polygon.io'] = (0.6, behaviour['Polygon.io'][1])
+    api_calls = []
+    result = failover.get_data('AAA', '1m', api_key='key', api_calls=api_calls, latency_budget=0.05)
+    assert result['source'] == 'Yahoo Finance'
+    # Charged one call for the request in flight when Yahoo Finance won
+    assert len(api_calls) == 1
+    wait_idle()
+    # The loser never made its retry, and its cancellation isn't counted as a failure
+    assert len(api_calls) == 1
+    assert failover._health['Polygon.io']['requests'] == 0
+    assert failover._health['Polygon.io']['error_rate'] == 0.0
+
+def test_rate_limited_polygon_is_skipped(providers):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.0, None)
+    api_calls = [time.time()] * 5
+    assert failover.get_data('AAA', '1m', api_key='key', api_calls=api_calls) is None
+    assert calls['Polygon.io'] == 0
+
+def test_workers_never_touch_the_callers_list(providers, monkeypatch):
+    behaviour, calls = providers
+    behaviour['Yahoo Finance'] = (0.0, None)
+    main = threading.get_ident()
+
+    class Guarded(list):
+        def __setitem__(self, *args):
+            assert threading.get_ident() == main
+            super().__setitem__(*args)
+
+        def extend(self, *args):
+            assert threading.get_ident() == main
+            super().extend(*args)
+
+    api_calls = Guarded()
+    assert failover.get_data('AAA', '1m', api_key='key', api_calls=api_calls)['source'] == 'Polygon.io'
+    assert len(api_calls) == 2
@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import http_pool
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    http_pool.close_all()
+    yield
+    http_pool.close_all()
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+
+def test_track_counts_requests_and_errors():
+    http_pool.polygon_client('key')
+    with http_pool.track('Polygon.io', 'key'):
+        pass
+    with pytest.raises(RuntimeError):
+        with http_pool.track('Polygon.io', 'key'):
+            raise RuntimeError('boom')
+    # Requests to a source without a pool are not counted anywhere
+    with http_pool.track('Yahoo Finance'):
+        pass
+    [row] = http_pool.pool_stats()
+    assert row['Source'] == 'Polygon.io'
+    assert (row['Requests'], row['Errors']) == (2, 1)
+    assert row['Last Latency (ms)'] is not None
+    assert (row['Connections Opened'], row['Idle Connections']) == (0, 0)
+
+def test_polygon_client_is_shared_per_key():
+    assert http_pool.polygon_client('key') is http_pool.polygon_client('key')
+    assert http_pool.polygon_client('key') is not http_pool.polygon_client('other')
+    assert len(http_pool.pool_stats()) == 2
+
+def test_configure_rebuilds_clients():
+    client = http_pool.polygon_client('key')
+    http_pool.configure(pool_size=4)
+    try:
+        assert http_pool.polygon_client('key') is not client
+        assert http_pool.pool_stats()[0]['Pool Size'] == 4
+    finally:
+        http_pool.configure(pool_size=10)
+    with pytest.raises(ValueError):
+        http_pool.configure(pool_sise=4)
+
+@pytest.mark.parametrize('error', [ImportError, TypeError, AttributeError])
+def test_yahoo_session_falls_back_to_requests(monkeypatch, error):
+    def broken():
+        raise error('curl_cffi internals changed')
+    monkeypatch.setattr(http_pool, '_pooled_curl_session_class', broken)
+    session = http_pool._yahoo_session()
+    assert isinstance(session, requests.Session)
+    assert session.get_adapter('https://example.com')._pool_maxsize == http_pool.SETTINGS['pool_size']
+
+def test_pooled_curl_session_reuses_handles_across_threads(server):
+    pytest.importorskip('curl_cffi')
+    session = http_pool._pooled_curl_session_class()()
+    try:
+        for _ in range(3):
+            thread = threading.Thread(target=lambda: session.get(server).raise_for_status())
+            thread.start()
+            thread.join()
+        # Sequential requests from different threads all ran on the one pooled handle
+        assert len(session._all_handles) == 1
+
+        barrier = threading.Barrier(3)
+        def concurrent():
+            barrier.wait()
+            session.get(server).raise_for_status()
+        threads = [threading.Thread(target=concurrent) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert 1 <= len(session._all_handles) <= 3
+        assert len(session._handles) == len(session._all_handles)
+    finally:
+        session.close()
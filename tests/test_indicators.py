@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+# Run each test on the NumPy implementations and, when numba is installed, on the JIT kernels
+@pytest.fixture(params=[False, True], ids=['numpy', 'numba'])
+def backend(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numba')
+    monkeypatch.setattr(indicators, 'USE_NUMBA', request.param)
+    return request.param
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    x = 100 + np.cumsum(rng.normal(0, 1, 300))
+    x[[5, 40, 41, 200]] = np.nan
+    return x
+
+# The dashboards' original pandas RSI
+def pandas_rsi(close, periods=14):
+    delta = pd.Series(close).diff()
+    gain = delta.where(delta > 0, 0).rolling(window=periods, min_periods=1).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=periods, min_periods=1).mean()
+    rs = gain / loss.replace(0, 1e-10)
+    return (100 - (100 / (1 + rs))).to_numpy()
+
+@pytest.mark.parametrize('window, min_periods', [(1, None), (20, None), (20, 1), (50, 10)])
+def test_sma_matches_pandas(backend, series, window, min_periods):
+    expected = pd.Series(series).rolling(window, min_periods=min_periods).mean().to_numpy()
+    np.testing.assert_allclose(indicators.sma(series, window, min_periods), expected)
+
+@pytest.mark.parametrize('span', [2, 12, 26])
+def test_ema_matches_pandas(backend, series, span):
+    expected = pd.Series(series).ewm(span=span, adjust=False, ignore_na=True).mean().to_numpy()
+    np.testing.assert_allclose(indicators.ema(series, span), expected)
+
+def test_rsi_matches_pandas(backend, series):
+    close = series[~np.isnan(series)]
+    np.testing.assert_allclose(indicators.rsi(close), pandas_rsi(close), equal_nan=True)
+
+def test_rsi_wilder_matches_reference(backend, series):
+    close = series[~np.isnan(series)]
+    delta = np.diff(close)
+    avg_gain, avg_loss = np.where(delta > 0, delta, 0)[:14].mean(), np.where(delta < 0, -delta, 0)[:14].mean()
+    expected = np.full(len(close), np.nan)
+    expected[14] = 100 - 100 / (1 + avg_gain / avg_loss)
+    for i in range(15, len(close)):
+        change = delta[i - 1]
+        avg_gain = (avg_gain * 13 + max(change, 0)) / 14
+        avg_loss = (avg_loss * 13 + max(-change, 0)) / 14
+        expected[i] = 100 - 100 / (1 + avg_gain / avg_loss)
+    np.testing.assert_allclose(indicators.rsi_wilder(close), expected, equal_nan=True)
+
+@pytest.mark.parametrize('window, min_periods', [(20, None), (20, 1)])
+def test_rolling_extrema_match_pandas(backend, series, window, min_periods):
+    rolling = pd.Series(series).rolling(window, min_periods=min_periods)
+    np.testing.assert_allclose(indicators.rolling_max(series, window, min_periods), rolling.max().to_numpy())
+    np.testing.assert_allclose(indicators.rolling_min(series, window, min_periods), rolling.min().to_numpy())
+
+def test_breakout_levels_match_tail(backend, series):
+    high, low, volume = series + 1, series - 1, np.abs(series) * 10
+    resistance, support, avg_volume = indicators.breakout_levels(high, low, volume, 20)
+    assert resistance == np.nanmax(high[-20:])
+    assert support == np.nanmin(low[-20:])
+    assert avg_volume == pytest.approx(np.nanmean(volume[-20:]))
+
+def test_2d_input_matches_rows(backend, series):
+    matrix = np.vstack([series, series[::-1], series * 2])
+    for func, args in ((indicators.sma, (20,)), (indicators.ema, (12,)), (indicators.rolling_max, (10,))):
+        out = func(matrix, *args)
+        assert out.shape == matrix.shape
+        for row in range(matrix.shape[0]):
+            np.testing.assert_allclose(out[row], func(matrix[row], *args))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+import portfolio
+
+def assert_same_matrix(actual, expected):
+    assert actual['symbols'] == expected['symbols']
+    assert actual['interval'] == expected['interval']
+    np.testing.assert_array_equal(actual['timestamps'], expected['timestamps'])
+    np.testing.assert_allclose(actual['close'], expected['close'])
+
+def test_incremental_update_matches_rebuild(bars):
+    full = {'AAA': bars(300, seed=1), 'BBB': bars(300, seed=2).iloc[5:]}
+    intervals = {'AAA': '1m', 'BBB': '1m'}
+    matrix = portfolio.build_price_matrix({symbol: df.iloc[:200] for symbol, df in full.items()}, intervals)
+    for end in (201, 230, 300):
+        # The previous newest bar may still have been forming; revise its close
+        frames = {symbol: df.iloc[:end].copy() for symbol, df in full.items()}
+        frames['AAA'].iloc[-1, frames['AAA'].columns.get_loc('Close')] += 0.5
+        matrix = portfolio.update_price_matrix(matrix, frames, intervals)
+        assert_same_matrix(matrix, portfolio.build_price_matrix(frames, intervals))
+
+def test_update_caps_history(bars):
+    full = {'AAA': bars(120, seed=1)}
+    matrix = portfolio.build_price_matrix({'AAA': full['AAA'].iloc[:100]}, {'AAA': '1m'}, max_bars=50)
+    matrix = portfolio.update_price_matrix(matrix, full, {'AAA': '1m'}, max_bars=50)
+    assert matrix['close'].shape == (1, 50)
+    assert_same_matrix(matrix, portfolio.build_price_matrix(full, {'AAA': '1m'}, max_bars=50))
+
+def test_mixed_intervals_are_resampled_to_the_coarsest(bars):
+    minute = bars(390, seed=1)
+    hourly = bars(7, freq='1h', seed=2)
+    matrix = portfolio.build_price_matrix({'AAA': minute, 'BBB': hourly}, {'AAA': '1m', 'BBB': '1h'})
+    assert matrix['interval'] == '1h'
+    times = pd.to_datetime(matrix['timestamps'], utc=True)
+    assert list(times) == list(hourly.index)
+    # Each hourly column holds the minute series' last close in that hour, not a forward-filled run
+    np.testing.assert_allclose(matrix['close'][0], minute['Close'].groupby(np.arange(len(minute)) // 60).last().to_numpy())
+    np.testing.assert_allclose(matrix['close'][1], hourly['Close'].to_numpy())
+
+def test_update_only_rebins_recent_bars(bars, monkeypatch):
+    minute = bars(390, seed=1)
+    hourly = bars(7, freq='1h', seed=2)
+    intervals = {'AAA': '1m', 'BBB': '1h', 'CCC': '1h'}
+    matrix = portfolio.build_price_matrix({'AAA': minute.iloc[:300], 'BBB': hourly.iloc[:5], 'CCC': hourly.iloc[:5]},
+                                          intervals)
+    rebinned = []
+    resample = portfolio._resample
+    monkeypatch.setattr(portfolio, '_resample', lambda df, interval: rebinned.append(len(df)) or resample(df, interval))
+    frames = {'AAA': minute, 'BBB': hourly, 'CCC': hourly}
+    matrix = portfolio.update_price_matrix(matrix, frames, intervals)
+    # Only the 1m symbol is re-binned, and only from the start of its previous last hour
+    assert rebinned == [390 - 240]
+    monkeypatch.setattr(portfolio, '_resample', resample)
+    assert_same_matrix(matrix, portfolio.build_price_matrix(frames, intervals))
+
+def test_interval_change_rebuilds(bars):
+    frames = {'AAA': bars(390, seed=1), 'BBB': bars(78, freq='5min', seed=2)}
+    matrix = portfolio.build_price_matrix(frames, {'AAA': '1m', 'BBB': '1m'})
+    matrix = portfolio.update_price_matrix(matrix, frames, {'AAA': '1m', 'BBB': '5m'})
+    assert_same_matrix(matrix, portfolio.build_price_matrix(frames, {'AAA': '1m', 'BBB': '5m'}))
+
+def test_analytics_match_pandas(bars):
+    frames = {'AAA': bars(200, seed=1), 'BBB': bars(200, seed=2)}
+    matrix = portfolio.build_price_matrix(frames, {'AAA': '1m', 'BBB': '1m'})
+    analytics = portfolio.portfolio_analytics(matrix, window=30, benchmark='AAA')
+    returns = pd.DataFrame({symbol: np.log(df['Close']).diff() for symbol, df in frames.items()})
+    np.testing.assert_allclose(analytics['volatility'][1, 40:], returns['BBB'].rolling(30).std().to_numpy()[40:] * 100)
+    np.testing.assert_allclose(analytics['correlation'][1, 40:],
+                               returns['BBB'].rolling(30).corr(returns['AAA']).to_numpy()[40:], atol=1e-9)
+    np.testing.assert_allclose(analytics['performance'][0, -1], (frames['AAA']['Close'].iloc[-1] / frames['AAA']['Close'].iloc[0] - 1) * 100)
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+
+import scheduler
+
+def at(text):
+    return scheduler.LOCAL_TZ.localize(datetime.strptime(text, '%Y-%m-%d %H:%M:%S')).timestamp()
+
+@pytest.mark.parametrize('text, session', [
+    ('2025-01-02 03:59:00', 'closed'),
+    ('2025-01-02 04:00:00', 'pre'),
+    ('2025-01-02 09:30:00', 'regular'),
+    ('2025-01-02 16:00:00', 'post'),
+    ('2025-01-02 20:00:00', 'closed'),
+    ('2025-01-04 12:00:00', 'closed'),
+])
+def test_market_session(text, session):
+    assert scheduler.market_session(at(text)) == session
+
+def test_next_open_skips_the_weekend():
+    friday_evening = at('2025-01-03 17:00:00')
+    assert scheduler.next_open(friday_evening) == at('2025-01-06 09:30:00')
+    assert scheduler.next_open(friday_evening, extended_hours=True) == at('2025-01-03 17:00:00')
+    assert scheduler.next_open(at('2025-01-03 21:00:00'), extended_hours=True) == at('2025-01-06 04:00:00')
+
+def test_first_fetch_is_due_after_next_candle_plus_delay():
+    schedule = {}
+    due = scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '5m', now=at('2025-01-02 10:02:00'))
+    assert due == at('2025-01-02 10:05:00') + scheduler.DATA_DELAY['Yahoo Finance']
+    assert schedule['AAA']['source'] == 'Yahoo Finance'
+
+def test_polygon_delay_is_capped_by_bar_age():
+    schedule = {}
+    due = scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '5m', now=at('2025-01-02 10:02:00'),
+                                 data_source='Polygon.io')
+    # The newest bar is 120 s old, so the feed can't be more than 120 s behind
+    assert due == at('2025-01-02 10:05:00') + 120
+
+def test_session_last_bar_is_refetched_after_the_close():
+    schedule = {}
+    due = scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 15:55:00'), '5m', now=at('2025-01-02 15:58:00'))
+    assert due == at('2025-01-02 16:00:00') + scheduler.DATA_DELAY['Yahoo Finance']
+    # After that final fetch the next one waits for the next open
+    due = scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 15:55:00'), '5m', now=due)
+    assert due == at('2025-01-03 09:30:00') + schedule['AAA']['delay']
+
+def test_overdue_candle_checks_back_one_interval_later():
+    now = at('2025-01-02 11:00:00')
+    due = scheduler.record_fetch({}, 'AAA', at('2025-01-02 10:00:00'), '5m', now=now)
+    assert due == now + 300
+
+@pytest.mark.parametrize('extended_hours, reopen', [(False, '2025-01-06 09:30:00'), (True, '2025-01-06 04:00:00')])
+def test_stale_feed_waits_for_the_next_open_over_the_weekend(extended_hours, reopen):
+    # The feed has no post-market bars, so its newest bar stays Friday's 15:55 candle
+    schedule = {}
+    last_bar = at('2025-01-03 15:55:00')
+    now = at('2025-01-03 20:30:00')
+    fetches = 0
+    while now < at(reopen):
+        now = scheduler.record_fetch(schedule, 'AAA', last_bar, '5m', now=now, extended_hours=extended_hours)
+        fetches += 1
+    assert fetches == 1
+    assert now == at(reopen) + schedule['AAA']['delay']
+
+def test_max_gap_caps_the_wait_only_while_trading():
+    now = at('2025-01-02 13:31:00')
+    assert scheduler.record_fetch({}, 'AAA', at('2025-01-02 13:30:00'), '1h', now=now, max_gap=60) == now + 60
+    assert scheduler.record_fetch({}, 'AAA', at('2025-01-02 13:30:00'), '1h', now=now) == \
+        at('2025-01-02 14:30:00') + scheduler.DATA_DELAY['Yahoo Finance']
+    saturday = at('2025-01-04 12:00:00')
+    assert scheduler.record_fetch({}, 'AAA', at('2025-01-03 15:30:00'), '1h', now=saturday, max_gap=60) > saturday + 60
+
+@pytest.mark.parametrize('interval, fraction, gap', [
+    ('1h', 0.25, 900),
+    ('15m', 0.5, 450),
+    ('5m', 0.25, 75),
+    ('5m', 0.1, scheduler.MIN_FRESHNESS_GAP),
+    ('1m', 0.25, None),
+    ('1h', 0, None),
+    ('1h', None, None),
+])
+def test_freshness_gap_scales_with_the_candle(interval, fraction, gap):
+    assert scheduler.freshness_gap(interval, fraction) == gap
+
+def test_delay_is_learned_from_due_fetches():
+    schedule = {}
+    due = scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '1m', now=at('2025-01-02 10:00:30'))
+    # Fetched when due but the next bar wasn't out yet: back off past the time already waited
+    scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '1m', now=due)
+    assert schedule['AAA']['delay'] > scheduler.DATA_DELAY['Yahoo Finance']
+    assert schedule['AAA']['floor'] == scheduler.DATA_DELAY['Yahoo Finance']
+    # Found when due: the estimate moves back toward the known lower bound
+    delay = schedule['AAA']['delay']
+    scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:01:00'), '1m', now=schedule['AAA']['due'])
+    assert schedule['AAA']['floor'] + scheduler.MIN_DELAY <= schedule['AAA']['delay'] < delay
+
+def test_source_change_relearns_the_delay():
+    schedule = {}
+    scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '5m', now=at('2025-01-02 10:02:00'))
+    schedule['AAA']['delay'] = 60
+    scheduler.record_fetch(schedule, 'AAA', at('2025-01-02 10:00:00'), '5m', now=at('2025-01-02 10:02:00'),
+                           data_source='Polygon.io')
+    assert schedule['AAA']['source'] == 'Polygon.io'
+    assert schedule['AAA']['delay'] == 120
+
+def test_due_symbols_and_wait():
+    now = at('2025-01-02 10:00:00')
+    schedule = {'AAA': {'due': now - 1}, 'BBB': {'due': now + 30}}
+    assert scheduler.due_symbols(schedule, ['AAA', 'BBB', 'CCC'], now=now) == ['AAA', 'CCC']
+    assert scheduler.seconds_until_due(schedule, ['BBB'], now=now) == 30
+    assert scheduler.seconds_until_due(schedule, ['AAA'], now=now) == 1
+    assert scheduler.seconds_until_due(schedule, [], now=now, max_wait=600) == 600
+    scheduler.defer(schedule, 'CCC', 45, now=now)
+    assert scheduler.due_symbols(schedule, ['CCC'], now=now + 44) == []